@@ -0,0 +1,5 @@
+"""
+Benchmarks, run from the repository root as modules, for instance:
+
+    python -m benchmarks.harness --help
+"""
@@ -0,0 +1,73 @@
+"""
+Compare exact contradictions with bounded depth and epsilon cutoff modes:
+construction and solve time, winner, error bound of the last iteration
+and actual max difference of users strengths.
+
+    python -m benchmarks.approximation [theses]
+
+run from the repository root.
+"""
+
+import sys
+import time
+
+from dr.simple_solver import Solver
+
+from .generator import generate
+
+
+MODES = [
+    (None, 0),
+    (8, 0),
+    (4, 0),
+    (2, 0),
+    (None, .01),
+    (None, .1),
+    (4, .01),
+]
+
+
+def main(theses):
+    problem = generate(
+        theses=theses,
+        support_density=3.0,
+        contradictions=max(1, theses // 10),
+        users=max(10, theses // 2),
+        votes_per_user=10,
+    )
+
+    print('%10s %8s %8s %8s %10s %8s %10s %10s' % (
+        'max_depth', 'epsilon', 'init', 'solve', 'iterations', 'winner',
+        'bound', 'error'))
+
+    exact = None
+
+    for max_depth, epsilon in MODES:
+        start = time.perf_counter()
+        solver = Solver(
+            problem, max_iterations=100, max_depth=max_depth, epsilon=epsilon)
+        init = time.perf_counter() - start
+
+        winner = solver.solve()
+        elapsed = time.perf_counter() - start - init
+
+        if exact is None:
+            exact = solver
+            exact_winner = winner
+
+        error = max(
+            (
+                abs(user_data.strength - exact.users[user].strength)
+                for user, user_data in solver.users.items()
+            ),
+            default=0
+        )
+
+        print('%10s %8s %8.3f %8.3f %10s %8s %10.2g %10.2g' % (
+            max_depth, epsilon, init, elapsed, solver.report.iterations,
+            'same' if winner is exact_winner else 'changed',
+            solver.report.error_bound or 0, error))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,42 @@
+"""
+Time solve_many with an increasing number of workers.
+
+    python -m benchmarks.batch [problems]
+
+run from the repository root.
+"""
+
+import os
+import sys
+import time
+
+from dr.batch import solve_many
+
+from .convergence import random_problem
+
+
+def main(problems):
+    problems = [
+        random_problem(seed, theses=60, relations=120, users=30)
+        for seed in range(problems)
+    ]
+
+    print('%10s %10s %10s' % ('workers', 'seconds', 'speedup'))
+
+    serial = None
+    workers = 1
+
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        solve_many(problems, workers=workers, max_iterations=100)
+        elapsed = time.perf_counter() - start
+
+        serial = serial or elapsed
+
+        print('%10s %10.3f %10.2f' % (workers, elapsed, serial / elapsed))
+
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,76 @@
+"""
+Compare convergence strategies on random problems with contradictions:
+iterations to converge, and problems not converged within the cap.
+
+    python -m benchmarks.convergence [problems]
+
+run from the repository root.
+"""
+
+import random
+import sys
+
+from dr.convergence import Aitken, Anderson, Damping, FixedPoint
+from dr.model import Thesis, Relation, User, Problem
+from dr.simple_solver import Solver
+
+
+MAX_ITERATIONS = 200
+
+STRATEGIES = [
+    ('fixed point', FixedPoint),
+    ('damping', Damping),
+    ('aitken', Aitken),
+    ('anderson', Anderson),
+]
+
+
+def random_problem(seed, theses=8, relations=12, users=5):
+    rnd = random.Random(seed)
+
+    users = [User('u%s' % i) for i in range(users)]
+    theses = [Thesis('t%s' % i, i < 3) for i in range(theses)]
+
+    p = Problem('benchmark')
+
+    for t in theses:
+        p.add_thesis(t)
+
+    for _ in range(relations):
+        t1, t2 = rnd.sample(theses, 2)
+
+        p.add_relation(Relation(
+            rnd.choice([Relation.SUPPORT, Relation.CONTRADICTION]), t1, t2))
+
+    for voted in sorted(p.theses, key=str) + sorted(p.relations, key=str):
+        for u in rnd.sample(users, rnd.randint(1, 3)):
+            voted.upvote(u)
+
+    return p
+
+
+def main(problems):
+    print('%12s %10s %10s %10s' % (
+        'strategy', 'iterations', 'max', 'capped'))
+
+    for name, strategy in STRATEGIES:
+        iterations = []
+        capped = 0
+
+        for seed in range(problems):
+            solver = Solver(
+                random_problem(seed),
+                max_iterations=MAX_ITERATIONS,
+                convergence=strategy()
+            )
+            solver.solve()
+
+            iterations.append(solver.report.iterations)
+            capped += not solver.report.converged
+
+        print('%12s %10.2f %10s %10s' % (
+            name, sum(iterations) / len(iterations), max(iterations), capped))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,73 @@
+"""
+Seeded generator of random problems.
+"""
+
+import random
+
+from dr.model import Thesis, Relation, User, Problem
+
+
+def generate(theses=100, support_density=2.0, cycle_rate=0.0,
+             contradictions=10, users=50, votes_per_user=10,
+             solution_rate=.1, downvote_rate=.2, seed=0):
+    """
+    Return a random problem with:
+
+    - theses, solution_rate of them being solutions;
+    - about support_density support relations per thesis, following a
+      hidden order of the theses, so they form a DAG, except for a
+      cycle_rate fraction of them which go backwards, closing cycles;
+    - contradictions contradiction relations between random theses;
+    - users voting votes_per_user random theses or relations each,
+      downvoting downvote_rate of them.
+
+    The same arguments always give the same problem.
+    """
+
+    rnd = random.Random(seed)
+
+    p = Problem('benchmark %s' % seed)
+
+    all_theses = [
+        Thesis('t%s' % i, rnd.random() < solution_rate)
+        for i in range(theses)
+    ]
+
+    for t in all_theses:
+        p.add_thesis(t)
+
+    if theses < 2:
+        return p
+
+    supports = int(theses * support_density)
+    attempts = 0
+
+    while len(p.relations) < supports and attempts < supports * 10:
+        attempts += 1
+
+        i, j = sorted(rnd.sample(range(theses), 2))
+
+        if rnd.random() < cycle_rate:
+            i, j = j, i
+
+        # a thesis supports another one coming after it in all_theses
+        p.add_relation(
+            Relation(Relation.SUPPORT, all_theses[i], all_theses[j]))
+
+    for _ in range(contradictions):
+        t1, t2 = rnd.sample(all_theses, 2)
+
+        p.add_relation(Relation(Relation.CONTRADICTION, t1, t2))
+
+    voted = sorted(p.theses, key=str) + sorted(p.relations, key=str)
+
+    for i in range(users):
+        user = User('u%s' % i)
+
+        for v in rnd.sample(voted, min(votes_per_user, len(voted))):
+            if rnd.random() < downvote_rate:
+                v.downvote(user)
+            else:
+                v.upvote(user)
+
+    return p
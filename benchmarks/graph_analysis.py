@@ -0,0 +1,48 @@
+"""
+Time the support graph analysis done while constructing a Solver.
+
+    python -m benchmarks.graph_analysis [relations ...]
+
+run from the repository root.
+"""
+
+import random
+import sys
+import time
+
+from dr.model import Thesis, Relation, Problem
+from dr.simple_solver import Solver
+
+
+def random_problem(relations, seed=0):
+    rnd = random.Random(seed)
+
+    p = Problem('benchmark')
+
+    theses = [Thesis('t%s' % i, i % 10 == 0) for i in range(relations // 5)]
+
+    for t in theses:
+        p.add_thesis(t)
+
+    while len(p.relations) < relations:
+        p.add_relation(Relation(
+            Relation.SUPPORT, rnd.choice(theses), rnd.choice(theses)))
+
+    return p
+
+
+def main(sizes):
+    print('%10s %10s %10s' % ('theses', 'relations', 'seconds'))
+
+    for size in sizes:
+        p = random_problem(size)
+
+        start = time.perf_counter()
+        Solver(p)
+        elapsed = time.perf_counter() - start
+
+        print('%10s %10s %10.3f' % (len(p.theses), len(p.relations), elapsed))
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,162 @@
+"""
+Time Solver construction phases and solve() across a sweep of problem
+sizes, save the results as JSON and flag regressions against a baseline.
+
+    python -m benchmarks.harness --output results.json
+    python -m benchmarks.harness --baseline results.json
+
+run from the repository root. Exits with status 1 when a timing exceeds
+the baseline by more than the tolerance.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from dr import numpy_solver
+from dr import simple_solver
+from dr.metrics import Recorder
+
+from .generator import generate
+
+
+SIZES = [100, 1000, 10000]
+
+SOLVERS = {
+    'simple': simple_solver.Solver,
+    'numpy': numpy_solver.Solver,
+}
+
+# printed, every metrics timing is saved
+PHASES = ['graph_analysis', 'contradictions', 'init', 'solve']
+
+
+def workload(size, seed=0):
+    # everything scales with the number of theses
+    return dict(
+        theses=size,
+        support_density=2.0,
+        cycle_rate=.01,
+        contradictions=max(1, size // 10),
+        users=max(10, size // 2),
+        votes_per_user=10,
+        seed=seed,
+    )
+
+
+def run(sizes, solvers, repeat, max_iterations):
+    results = []
+
+    for size in sizes:
+        params = workload(size)
+        problem = generate(**params)
+
+        for name in solvers:
+            best = {}
+
+            # the fastest run is the least noisy estimate
+            for _ in range(repeat):
+                metrics = Recorder()
+
+                start = time.perf_counter()
+                solver = SOLVERS[name](
+                    problem, max_iterations=max_iterations, metrics=metrics)
+                init = time.perf_counter() - start
+
+                solver.solve()
+
+                timings = {
+                    phase: metrics.total(phase)
+                    for phase in metrics.timings
+                }
+                timings['init'] = init
+                timings['solve'] = time.perf_counter() - start - init
+
+                for phase, seconds in timings.items():
+                    best[phase] = min(seconds, best.get(phase, seconds))
+
+            result = {
+                'solver': name,
+                'size': size,
+                'workload': params,
+                'relations': len(problem.relations),
+                'iterations': solver.report.iterations,
+                'converged': solver.report.converged,
+                'seconds': best,
+            }
+
+            results.append(result)
+
+            print('%8s %8s %8s %s' % (
+                name, size, result['iterations'],
+                ' '.join(
+                    '%s=%.4f' % (phase, best[phase]) for phase in PHASES)))
+
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Return (solver, size, phase, seconds, baseline seconds) for every
+    timing slower than baseline by more than tolerance, a fraction.
+    """
+
+    previous = {(r['solver'], r['size']): r for r in baseline}
+
+    found = []
+
+    for result in results:
+        base = previous.get((result['solver'], result['size']))
+
+        if base is None:
+            continue
+
+        for phase, seconds in result['seconds'].items():
+            base_seconds = base['seconds'].get(phase)
+
+            if base_seconds is not None and \
+                    seconds > base_seconds * (1 + tolerance):
+                found.append((
+                    result['solver'], result['size'], phase, seconds,
+                    base_seconds))
+
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--solvers', nargs='+', choices=sorted(SOLVERS),
+                        default=sorted(SOLVERS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-iterations', type=int, default=100)
+    parser.add_argument('--output', help='where to save results')
+    parser.add_argument('--baseline', help='results to compare with')
+    parser.add_argument('--tolerance', type=float, default=.2)
+
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.solvers, args.repeat, args.max_iterations)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+
+        for solver, size, phase, seconds, base_seconds in found:
+            print('regression: solver=%s, size=%s, phase=%s, '
+                  'seconds=%.4f, baseline=%.4f' % (
+                      solver, size, phase, seconds, base_seconds))
+
+        if found:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Measure load throughput, in votes per second, of JSONL and CSV dumps.
+
+    python -m benchmarks.loaders [votes]
+
+run from the repository root.
+"""
+
+import io
+import json
+import random
+import sys
+import time
+
+from dr import loaders
+from dr.model import Problem
+
+
+def dumps(votes, seed=0):
+    rnd = random.Random(seed)
+
+    theses = ['t%s' % i for i in range(max(10, votes // 100))]
+    users = ['u%s' % i for i in range(max(10, votes // 20))]
+
+    jsonl = []
+    csv = []
+
+    for i, t in enumerate(theses):
+        jsonl.append(json.dumps(
+            {'type': 'thesis', 'content': t, 'solution': i % 10 == 0}))
+        csv.append('thesis,%s,%s' % (t, 'true' if i % 10 == 0 else 'false'))
+
+    for _ in range(votes):
+        u = rnd.choice(users)
+        t = rnd.choice(theses)
+        v = rnd.choice([1, -1])
+
+        jsonl.append(json.dumps(
+            {'type': 'vote', 'user': u, 'vote': v, 'thesis': t}))
+        csv.append('vote,%s,%s,%s' % (u, v, t))
+
+    return '\n'.join(jsonl), '\n'.join(csv)
+
+
+def main(votes):
+    jsonl, csv = dumps(votes)
+
+    print('%8s %12s %12s' % ('format', 'votes', 'votes/s'))
+
+    for name, reader, data in [
+        ('jsonl', loaders.read_jsonl, jsonl),
+        ('csv', loaders.read_csv, csv),
+    ]:
+        start = time.perf_counter()
+        loaders.load(reader(io.StringIO(data)), Problem('benchmark'))
+        elapsed = time.perf_counter() - start
+
+        print('%8s %12s %12.0f' % (name, votes, votes / elapsed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,70 @@
+"""
+Vote independent graph analysis, shared by solvers of the same problem.
+
+Solver construction prunes support cycles, sorts theses by level and
+builds the support cones of contradiction theses: none of it depends on
+votes. A GraphAnalysis keeps those results and AnalysisCache hands them
+to later solvers of the same problem while its graph fingerprint, see
+dr.model.Problem, does not change. Only users and their contradictions
+are then computed again.
+"""
+
+import collections
+
+
+class GraphAnalysis:
+    def __init__(self, problem, theses_order, theses_levels, theses,
+                 apex_cones, max_depth=None):
+        self.problem = problem
+        self.graph_fingerprint = problem.graph_fingerprint
+        self.theses_order = theses_order
+        self.theses_levels = theses_levels
+        # from thesis to (supporting relations, supported relations,
+        # level, position), see simple_solver.ThesisData
+        self.theses = theses
+        self.apex_cones = apex_cones
+        self.max_depth = max_depth  # of the cones, see SupportCone
+
+    def is_valid(self, problem):
+        return self.problem is problem and \
+            self.graph_fingerprint == problem.graph_fingerprint
+
+
+class AnalysisCache:
+    """
+    LRU of the analyses of the last capacity problems. Analyses refer to
+    their problems, which stay alive while cached.
+    """
+
+    def __init__(self, capacity=16):
+        assert capacity > 0, 'illegal capacity'
+
+        self.capacity = capacity
+        self.analyses = collections.OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, problem):
+        key = id(problem)
+
+        analysis = self.analyses.get(key)
+
+        if analysis is None or not analysis.is_valid(problem):
+            self.misses += 1
+
+            return None
+
+        self.hits += 1
+        self.analyses.move_to_end(key)
+
+        return analysis
+
+    def put(self, analysis):
+        key = id(analysis.problem)
+
+        self.analyses[key] = analysis
+        self.analyses.move_to_end(key)
+
+        while len(self.analyses) > self.capacity:
+            self.analyses.popitem(last=False)
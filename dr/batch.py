@@ -0,0 +1,92 @@
+"""
+Solve many independent problems on a process pool.
+"""
+
+import concurrent.futures
+import functools
+import logging
+import os
+
+from . import serialization
+from . import simple_solver
+
+
+logger = logging.getLogger(__name__)
+
+
+# below this many problems, process startup and serialization cost more
+# than they save
+MIN_PARALLEL_PROBLEMS = 16
+
+
+def solve_many(problems, workers=None, chunksize=None,
+               solver=simple_solver.Solver, error_threshold=.01,
+               max_iterations=None):
+    """
+    Solve every problem and return the list of their solutions, in input
+    order: a solution is the thesis returned by solver.solve(), of the
+    input problem, or None.
+
+    Problems are encoded with dr.serialization and solved by a pool of
+    worker processes, os.cpu_count() by default, chunksize problems at a
+    time. Small batches and workers=1 are solved in process.
+    """
+
+    problems = list(problems)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    assert workers > 0, 'illegal workers'
+
+    if workers == 1 or len(problems) < MIN_PARALLEL_PROBLEMS:
+        return [
+            solver(
+                p,
+                error_threshold=error_threshold,
+                max_iterations=max_iterations
+            ).solve()
+            for p in problems
+        ]
+
+    if chunksize is None:
+        # a few chunks per worker balance uneven problem sizes
+        chunksize = max(1, len(problems) // (workers * 4))
+
+    encoded = [serialization.encode(p) for p in problems]
+
+    logger.info('solving: problems=%s, workers=%s, chunksize=%s',
+                len(problems), workers, chunksize)
+
+    solve = functools.partial(
+        solve_encoded,
+        solver=solver,
+        error_threshold=error_threshold,
+        max_iterations=max_iterations)
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        indexes = executor.map(
+            solve, (data for data, _ in encoded), chunksize=chunksize)
+
+        return [
+            None if i is None else theses[i]
+            for i, (_, theses) in zip(indexes, encoded)
+        ]
+
+
+def solve_encoded(data, solver, error_threshold, max_iterations):
+    """
+    Solve a problem encoded by dr.serialization.encode and return the
+    index of its solution in encoding order, or None. Meant to run in
+    worker processes or threads.
+    """
+
+    problem, theses = serialization.decode(data)
+
+    solution = solver(
+        problem,
+        error_threshold=error_threshold,
+        max_iterations=max_iterations
+    ).solve()
+
+    return None if solution is None else theses.index(solution)
@@ -0,0 +1,163 @@
+"""
+Results of solved problems, keyed by problem fingerprint.
+
+A Result holds the winner and the strength tables by content, thesis
+contents, relation keys and user names, so it applies to any problem with
+the same fingerprint and can be pickled. ResultCache keeps the most
+recently used results in memory and, if given a directory, every result
+on disk too.
+"""
+
+import collections
+import hashlib
+import logging
+import os
+import pickle
+
+from . import simple_solver
+from .model import Relation
+
+
+logger = logging.getLogger(__name__)
+
+
+class Result:
+    def __init__(self, winner, theses, relations, users, converged):
+        self.winner = winner  # content of the winning thesis, or None
+        # from content (relation key, user name) to strength
+        self.theses = theses
+        self.relations = relations  # keys are (type, content1, content2)
+        self.users = users
+        self.converged = converged
+
+    @classmethod
+    def of(cls, solver, winner):
+        return cls(
+            None if winner is None else winner.content,
+            {t.content: d.strength for t, d in solver.theses_data.items()},
+            {
+                (
+                    'support' if r.type is Relation.SUPPORT
+                    else 'contradiction',
+                    r.thesis1.content,
+                    r.thesis2.content,
+                ): d.strength
+                for r, d in solver.relations.items()
+            },
+            {u.name: d.strength for u, d in solver.users.items()},
+            solver.report.converged,
+        )
+
+    def winner_thesis(self, problem):
+        """
+        Return the winning thesis of problem, solved by this result.
+        """
+
+        if self.winner is None:
+            return None
+
+        return next(t for t in problem.theses if t.content == self.winner)
+
+
+class ResultCache:
+    def __init__(self, capacity=128, directory=None):
+        assert capacity > 0, 'illegal capacity'
+
+        self.capacity = capacity
+        self.directory = directory
+        self.results = collections.OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def solve(self, problem, solver=simple_solver.Solver, error_threshold=.01,
+              max_iterations=None):
+        """
+        Return the Result of problem, solving it only if not cached.
+        """
+
+        key = self._key(problem, solver, error_threshold, max_iterations)
+
+        result = self._get(key)
+
+        if result is not None:
+            self.hits += 1
+
+            return result
+
+        self.misses += 1
+
+        s = solver(
+            problem,
+            error_threshold=error_threshold,
+            max_iterations=max_iterations)
+
+        result = Result.of(s, s.solve())
+
+        self._put(key, result)
+
+        return result
+
+    def _key(self, problem, solver, error_threshold, max_iterations):
+        # results also depend on how problems are solved
+        settings = '%s.%s %r %r' % (
+            solver.__module__, solver.__qualname__,
+            error_threshold, max_iterations)
+
+        return '%016x-%s' % (
+            problem.fingerprint,
+            hashlib.blake2b(
+                settings.encode('utf-8'), digest_size=8).hexdigest())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pickle')
+
+    def _get(self, key):
+        result = self.results.get(key)
+
+        if result is not None:
+            self.results.move_to_end(key)
+
+            return result
+
+        if self.directory is None:
+            return None
+
+        try:
+            with open(self._path(key), 'rb') as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning('unreadable cached result: key=%s, error=%s',
+                           key, e)
+
+            return None
+
+        self._remember(key, result)
+
+        return result
+
+    def _put(self, key, result):
+        self._remember(key, result)
+
+        if self.directory is None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        # write and rename, so that readers never see partial files
+        path = self._path(key)
+        temporary = '%s.%s.tmp' % (path, os.getpid())
+
+        with open(temporary, 'wb') as f:
+            pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temporary, path)
+
+    def _remember(self, key, result):
+        self.results[key] = result
+        self.results.move_to_end(key)
+
+        while len(self.results) > self.capacity:
+            self.results.popitem(last=False)
@@ -0,0 +1,166 @@
+"""
+Compact variant of dr.model: objects have no per-instance __dict__ and
+are hashed and compared by a dense integer id.
+
+Users vote before being known to any problem, so they are hashed by
+name (python caches string hashes); each Problem interns the names of
+its voters into dense ids when their first vote reaches it. Theses and
+relations get their id when added to a Problem, interned by content (by
+type and theses for relations), so adding an equal thesis twice yields
+the same id, like the sets of dr.model.Problem do. Theses and relations
+belong to a single problem and cannot be hashed before being added to it.
+
+Relation types are the dr.model.Relation markers, so solvers work
+unchanged with both models.
+"""
+
+from . import model
+
+
+class User:
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        assert type(name) is str and len(name) > 0, 'illegal name'
+
+        self.name = name
+
+    def __eq__(self, other):
+        return self is other or \
+            isinstance(other, User) and self.name == other.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __str__(self):
+        return self.name
+
+
+class Problem (model.Problem):
+    def __init__(self, question):
+        super().__init__(question)
+
+        self.user_ids = {}  # from name to id
+        self.thesis_ids = {}  # from content to id
+        self.relation_ids = {}  # from (type, thesis1 id, thesis2 id) to id
+
+    def add_thesis(self, thesis):
+        assert isinstance(thesis, Thesis), 'illegal thesis'
+        assert thesis.problem in (None, self), 'thesis of another problem'
+
+        thesis.id = self.thesis_ids.setdefault(
+            thesis.content, len(self.thesis_ids))
+        thesis.problem = self
+
+        self._insert_thesis(thesis)
+
+    def add_relation(self, relation):
+        assert isinstance(relation, Relation), 'illegal relation'
+        assert relation.problem in (None, self), 'relation of another problem'
+        assert relation.thesis1.problem is self, 'unknown thesis 1'
+        assert relation.thesis2.problem is self, 'unknown thesis 2'
+
+        key = (
+            relation.type is Relation.SUPPORT,
+            relation.thesis1.id,
+            relation.thesis2.id,
+        )
+
+        relation.id = self.relation_ids.setdefault(key, len(self.relation_ids))
+        relation.problem = self
+
+        self._insert_relation(relation)
+
+    def _add_voted(self, voted):
+        for user, vote in voted.votes.items():
+            self._vote_cast(voted, user, vote)
+
+    def _vote_cast(self, voted, user, vote, previous=None):
+        self.user_ids.setdefault(user.name, len(self.user_ids))
+
+        super()._vote_cast(voted, user, vote, previous)
+
+
+class Voted:
+    __slots__ = ('votes', 'problem', 'id')
+
+    def __init__(self):
+        self.votes = dict()  # from users to -1/+1
+        self.problem = None
+        self.id = None
+
+    def __eq__(self, other):
+        return self is other or (
+            type(other) is type(self) and
+            self.id is not None and
+            self.id == other.id and
+            self.problem is other.problem
+        )
+
+    def __hash__(self):
+        assert self.id is not None, 'not added to a problem'
+
+        return self.id
+
+    def upvote(self, user):
+        assert isinstance(user, User), 'illegal user'
+
+        self._vote(user, +1)
+
+    def downvote(self, user):
+        assert isinstance(user, User), 'illegal user'
+
+        self._vote(user, -1)
+
+    def _vote(self, user, vote):
+        previous = self.votes.get(user)
+
+        self.votes[user] = vote
+
+        if self.problem is not None:
+            self.problem._vote_cast(self, user, vote, previous)
+
+
+class Thesis (Voted):
+    __slots__ = ('content', 'is_solution')
+
+    def __init__(self, content, is_solution):
+        assert type(content) is str and len(content) > 0, 'illegal content'
+        assert type(is_solution) is bool, 'illegal is_solution'
+
+        super().__init__()
+
+        self.content = content
+        self.is_solution = is_solution
+
+    def __str__(self):
+        return '%s:"%s"' % (
+            'S' if self.is_solution else 'T',
+            self.content,
+        )
+
+
+class Relation (Voted):
+    __slots__ = ('type', 'thesis1', 'thesis2')
+
+    SUPPORT = model.Relation.SUPPORT
+    CONTRADICTION = model.Relation.CONTRADICTION
+
+    def __init__(self, relation_type, thesis1, thesis2):
+        assert relation_type in (Relation.CONTRADICTION, Relation.SUPPORT), \
+            'illegal relation_type'
+        assert isinstance(thesis1, Thesis), 'illegal thesis1'
+        assert isinstance(thesis2, Thesis), 'illegal thesis2'
+
+        super().__init__()
+
+        self.type = relation_type
+        self.thesis1 = thesis1
+        self.thesis2 = thesis2
+
+    def __str__(self):
+        return '%s%s%s' % (
+            self.thesis1,
+            '->' if self.type is Relation.SUPPORT else '-x-',
+            self.thesis2,
+        )
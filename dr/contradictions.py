@@ -0,0 +1,185 @@
+import concurrent.futures
+
+
+class SupportCone:
+    """
+    The theses supporting apex, directly or not, through the pruned
+    support DAG, apex included.
+
+    relations holds the support relations among them, sorted by
+    decreasing level of their supported thesis: when a relation is
+    reached, every path from its supported thesis to apex has already been
+    considered.
+
+    With max_depth, only theses at most max_depth support relations away
+    from apex are explored: frontier holds those max_depth away whose
+    supporting relations were left out.
+    """
+
+    def __init__(self, apex, theses_data, max_depth=None):
+        self.apex = apex
+        self.theses = {apex}
+        self.frontier = set()
+
+        relations = []
+        todo = [apex]
+        depth = 0
+
+        while todo:
+            if depth == max_depth:
+                self.frontier.update(
+                    t for t in todo if theses_data[t].supporting_relations)
+                break
+
+            depth += 1
+            supporting = []
+
+            for thesis in todo:
+                for relation in theses_data[thesis].supporting_relations:
+                    relations.append(relation)
+
+                    if relation.thesis1 not in self.theses:
+                        self.theses.add(relation.thesis1)
+                        supporting.append(relation.thesis1)
+
+            todo = supporting
+
+        relations.sort(key=lambda r: theses_data[r.thesis2].level,
+                       reverse=True)
+
+        self.relations = relations
+
+    def best_products(self, weight, epsilon=0):
+        """
+        Max-product dynamic programming over the cone: return, for each
+        thesis of the cone, the greatest product of weight(relation) along
+        a support path from the thesis to apex (1 for apex itself).
+
+        weight is at most 1, so products only decrease along a path: paths
+        are dropped as soon as their product falls below epsilon, and
+        theses reached by none of the others are left out.
+        """
+
+        best = {self.apex: 1}
+
+        for relation in self.relations:
+            product = best.get(relation.thesis2)
+
+            if product is None:
+                continue
+
+            product *= weight(relation)
+
+            if product >= epsilon and \
+                    product > best.get(relation.thesis1, -1):
+                best[relation.thesis1] = product
+
+        return best
+
+    def error_bound(self, best, epsilon=0):
+        """
+        Bound on how much the best products, as returned by
+        best_products(weight, epsilon), of any thesis supporting apex can
+        be smaller than those of the exact, unbounded cone: paths left out
+        either cross the frontier or fell below epsilon.
+        """
+
+        return max([epsilon] + [best.get(t, 0) for t in self.frontier])
+
+    @classmethod
+    def from_parts(cls, apex, theses, relations):
+        """
+        A cone already explored elsewhere, relations already sorted.
+        """
+
+        cone = cls.__new__(cls)
+
+        cone.apex = apex
+        cone.theses = theses
+        cone.frontier = set()
+        cone.relations = relations
+
+        return cone
+
+
+# parallel discovery of the contradictions of many contradiction relations.
+# workers get the pruned support graph once, in index form:
+#   supporting[t] = [(relation index, supporting thesis index), ...]
+#   levels[t] = level of thesis t
+#   voters[t] = [user index, ...]
+# and return indexes too, see discover_contradictions
+
+_graph = None
+
+
+def _init_worker(graph):
+    global _graph
+
+    _graph = graph
+
+
+def _cone_indexes(apex):
+    supporting, levels, _ = _graph
+
+    theses = {apex}
+    relations = []
+    todo = [apex]
+
+    while todo:
+        thesis = todo.pop()
+
+        for relation, thesis1 in supporting[thesis]:
+            relations.append((levels[thesis], relation))
+
+            if thesis1 not in theses:
+                theses.add(thesis1)
+                todo.append(thesis1)
+
+    relations.sort(key=lambda r: r[0], reverse=True)
+
+    return theses, [r for _, r in relations]
+
+
+def _voted_indexes(theses):
+    voters = _graph[2]
+    voted = {}
+
+    for thesis in theses:
+        for user in voters[thesis]:
+            voted.setdefault(user, []).append(thesis)
+
+    return voted
+
+
+def _discover(apexes):
+    thesis1, thesis2 = apexes
+
+    cones = (_cone_indexes(thesis1), _cone_indexes(thesis2))
+
+    voted1 = _voted_indexes(cones[0][0])
+    voted2 = _voted_indexes(cones[1][0])
+
+    return cones, [
+        (user, voted1[user], voted2[user])
+        for user in voted1.keys() & voted2.keys()
+    ]
+
+
+def discover_contradictions(graph, apexes, workers, chunksize=None):
+    """
+    For each (thesis1 index, thesis2 index) of apexes, the theses of a
+    contradiction relation, return ((cone1, cone2), users) where a cone is
+    (theses indexes, support relations indexes sorted as in SupportCone)
+    and users lists (user index, voted theses of cone1, of cone2) for each
+    user voting both cones.
+
+    Runs on a pool of worker processes, results in apexes order.
+    """
+
+    if chunksize is None:
+        chunksize = max(1, len(apexes) // (workers * 4))
+
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(graph,)
+    ) as executor:
+        return list(executor.map(_discover, apexes, chunksize=chunksize))
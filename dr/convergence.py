@@ -0,0 +1,185 @@
+"""
+Convergence strategies for the users strength fixed point.
+
+Each iteration maps the users strengths x to g(x), see the README. A
+strategy gets both and returns the strengths to start the next iteration
+from: plain fixed point iteration returns g(x) as it is.
+
+Strengths are passed as sequences in a stable user order, and results are
+clamped to [0, 1], the range of a user strength.
+"""
+
+
+class ConvergenceReport:
+    def __init__(self):
+        self.iterations = 0
+        # max squared difference between g(x) and x, see error_threshold
+        self.residual = None
+        self.converged = False
+        self.residuals = []
+        # with approximate contradictions, bound on how far the users
+        # strengths of the last iteration are from exact ones, see Solver
+        self.error_bound = None
+
+    def __str__(self):
+        return 'iterations=%s, residual=%s, converged=%s' % (
+            self.iterations, self.residual, self.converged)
+
+
+def _clamp(values):
+    return [min(1, max(0, v)) for v in values]
+
+
+class FixedPoint:
+    def reset(self):
+        pass
+
+    def accelerate(self, x, gx):
+        return gx
+
+
+class Damping (FixedPoint):
+    """
+    x' = x + factor * (g(x) - x): slower, but tames oscillations.
+    """
+
+    def __init__(self, factor=.5):
+        assert 0 < factor <= 1, 'illegal factor'
+
+        self.factor = factor
+
+    def accelerate(self, x, gx):
+        return [a + self.factor * (b - a) for a, b in zip(x, gx)]
+
+
+class Aitken (FixedPoint):
+    """
+    Componentwise Aitken delta squared extrapolation, applied every other
+    iteration on three consecutive plain iterates.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.previous = None
+
+    def accelerate(self, x, gx):
+        if self.previous is None or len(self.previous) != len(x):
+            self.previous = list(x)
+
+            return gx
+
+        x0 = self.previous
+        self.previous = None
+
+        result = []
+
+        for a, b, c in zip(x0, x, gx):
+            denominator = c - 2 * b + a
+
+            if abs(denominator) < 1e-12:
+                result.append(c)
+            else:
+                result.append(c - (c - b) ** 2 / denominator)
+
+        return _clamp(result)
+
+
+class Anderson (FixedPoint):
+    """
+    Anderson acceleration (type II) over the last depth iterations.
+    """
+
+    def __init__(self, depth=3, regularization=1e-10):
+        assert depth > 0, 'illegal depth'
+
+        self.depth = depth
+        self.regularization = regularization
+
+        self.reset()
+
+    def reset(self):
+        self.history = []  # (x, g(x)) pairs
+
+    def accelerate(self, x, gx):
+        if self.history and len(self.history[-1][0]) != len(x):
+            self.history = []
+
+        self.history.append((list(x), list(gx)))
+        del self.history[:-self.depth - 1]
+
+        if len(self.history) < 2:
+            return gx
+
+        residuals = [
+            [b - a for a, b in zip(hx, hgx)]
+            for hx, hgx in self.history
+        ]
+        f = residuals[-1]
+
+        # differences of consecutive residuals and of consecutive g(x)
+        df = [
+            [b - a for a, b in zip(r0, r1)]
+            for r0, r1 in zip(residuals, residuals[1:])
+        ]
+        dg = [
+            [b - a for a, b in zip(h0[1], h1[1])]
+            for h0, h1 in zip(self.history, self.history[1:])
+        ]
+
+        # least squares min |f - df gamma|, by normal equations
+        m = len(df)
+
+        matrix = [
+            [
+                sum(a * b for a, b in zip(df[i], df[j])) +
+                (self.regularization if i == j else 0)
+                for j in range(m)
+            ]
+            for i in range(m)
+        ]
+        vector = [sum(a * b for a, b in zip(df[i], f)) for i in range(m)]
+
+        gamma = _solve_linear(matrix, vector)
+
+        if gamma is None:
+            return gx
+
+        result = list(gx)
+
+        for g, column in zip(gamma, dg):
+            for k, v in enumerate(column):
+                result[k] -= g * v
+
+        return _clamp(result)
+
+
+def _solve_linear(matrix, vector):
+    # gaussian elimination with partial pivoting, None if singular
+
+    n = len(vector)
+    rows = [row[:] + [v] for row, v in zip(matrix, vector)]
+
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+
+        if abs(rows[pivot][col]) < 1e-15:
+            return None
+
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+
+        for r in range(col + 1, n):
+            factor = rows[r][col] / rows[col][col]
+
+            for c in range(col, n + 1):
+                rows[r][c] -= factor * rows[col][c]
+
+    solution = [0] * n
+
+    for r in reversed(range(n)):
+        solution[r] = (
+            rows[r][n] - sum(rows[r][c] * solution[c] for c in range(r + 1, n))
+        ) / rows[r][r]
+
+    return solution
@@ -0,0 +1,130 @@
+class GraphCycleError(ValueError):
+    pass
+
+
+def strongly_connected_components(nodes, successors):
+    """
+    Iterative Tarjan: yield the strongly connected components of the graph
+    as lists of nodes, in O(V+E).
+
+    successors maps a node to an iterable of nodes.
+    """
+
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+
+    for root in nodes:
+        if root in index:
+            continue
+
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+
+        work = [(root, iter(successors(root)))]
+
+        while work:
+            node, children = work[-1]
+
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+
+                    work.append((child, iter(successors(child))))
+                    break
+
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+
+            else:
+                work.pop()
+
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+                if lowlink[node] == index[node]:
+                    component = []
+
+                    while True:
+                        member = stack.pop()
+                        on_stack.remove(member)
+                        component.append(member)
+
+                        if member == node:
+                            break
+
+                    yield component
+
+
+def reachable(sources, successors):
+    """
+    Return the set of nodes reachable from sources, sources included.
+    """
+
+    seen = set(sources)
+    todo = list(seen)
+
+    while todo:
+        node = todo.pop()
+
+        for child in successors(node):
+            if child not in seen:
+                seen.add(child)
+                todo.append(child)
+
+    return seen
+
+
+def topological_levels(nodes, predecessors):
+    """
+    Kahn's algorithm: return nodes grouped in levels, in O(V+E).
+
+    A node belongs to the level following the highest level among its
+    predecessors, so every node of a level only depends on nodes of lower
+    levels. Raise GraphCycleError if the graph is not acyclic.
+
+    predecessors maps a node to an iterable of nodes.
+    """
+
+    indegree = {}
+    successors = {}
+
+    for node in nodes:
+        count = 0
+
+        for predecessor in predecessors(node):
+            successors.setdefault(predecessor, []).append(node)
+            count += 1
+
+        indegree[node] = count
+
+    levels = []
+    level = [node for node, count in indegree.items() if count == 0]
+    sorted_count = 0
+
+    while level:
+        levels.append(level)
+        sorted_count += len(level)
+
+        next_level = []
+
+        for node in level:
+            for successor in successors.get(node, ()):
+                indegree[successor] -= 1
+
+                if indegree[successor] == 0:
+                    next_level.append(successor)
+
+        level = next_level
+
+    if sorted_count < len(indegree):
+        raise GraphCycleError(
+            'graph is not acyclic: %s nodes in or after a cycle' % (
+                len(indegree) - sorted_count))
+
+    return levels
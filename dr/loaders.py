@@ -0,0 +1,244 @@
+"""
+Streaming loaders of theses, relations and votes.
+
+Readers turn lines of a file into (line number, record) pairs, one at a
+time, where a record is one of:
+
+    ('thesis', content, is_solution)
+    ('relation', relation type, thesis1 content, thesis2 content)
+    ('vote', user name, +1/-1, thesis content)
+    ('vote', user name, +1/-1, (relation type, thesis1, thesis2 content))
+
+and load() adds records to a dr.model.Problem in one pass, so a thesis
+must come before the relations and votes referring to it.
+
+JSONL lines are objects:
+
+    {"type": "thesis", "content": "t1", "solution": true}
+    {"type": "relation", "relation": "support",
+     "thesis1": "t2", "thesis2": "t1"}
+    {"type": "vote", "user": "u1", "vote": 1, "thesis": "t1"}
+    {"type": "vote", "user": "u1", "vote": -1, "relation": "support",
+     "thesis1": "t2", "thesis2": "t1"}
+
+CSV rows are the same, without headers:
+
+    thesis,t1,true
+    relation,support,t2,t1
+    vote,u1,1,t1
+    vote,u1,-1,support,t2,t1
+"""
+
+import csv
+import json
+
+from .model import Thesis, Relation, User
+
+
+class LoadError (ValueError):
+    def __init__(self, line, message):
+        super().__init__('line %s: %s' % (line, message))
+
+        self.line = line
+
+
+RELATION_TYPES = {
+    'support': Relation.SUPPORT,
+    'contradiction': Relation.CONTRADICTION,
+}
+
+BOOLEANS = {
+    'true': True,
+    'false': False,
+    '1': True,
+    '0': False,
+}
+
+
+def _strings(n, data, *keys):
+    # JSON values of keys, that must be strings
+    values = tuple(data[key] for key in keys)
+
+    for key, value in zip(keys, values):
+        if type(value) is not str:
+            raise LoadError(n, 'illegal %s: %r' % (key, value))
+
+    return values
+
+
+def read_jsonl(lines):
+    """
+    Generate records from JSONL lines, such as an open file.
+    """
+
+    for n, line in enumerate(lines, 1):
+        line = line.strip()
+
+        if not line:
+            continue
+
+        try:
+            data = json.loads(line)
+            record_type = data['type']
+
+            if record_type == 'thesis':
+                yield n, (
+                    'thesis', *_strings(n, data, 'content'), data['solution'])
+
+            elif record_type == 'relation':
+                relation, thesis1, thesis2 = _strings(
+                    n, data, 'relation', 'thesis1', 'thesis2')
+
+                yield n, (
+                    'relation', RELATION_TYPES[relation], thesis1, thesis2)
+
+            elif record_type == 'vote':
+                if 'thesis' in data:
+                    voted, = _strings(n, data, 'thesis')
+                else:
+                    relation, thesis1, thesis2 = _strings(
+                        n, data, 'relation', 'thesis1', 'thesis2')
+
+                    voted = (RELATION_TYPES[relation], thesis1, thesis2)
+
+                user, = _strings(n, data, 'user')
+
+                yield n, ('vote', user, data['vote'], voted)
+
+            else:
+                raise LoadError(n, 'unknown record type: %s' % record_type)
+
+        except LoadError:
+            raise
+
+        except (ValueError, KeyError, TypeError) as e:
+            raise LoadError(n, 'illegal record: %r' % e) from e
+
+
+def read_csv(lines):
+    """
+    Generate records from CSV lines, such as an open file.
+    """
+
+    for n, row in enumerate(csv.reader(lines), 1):
+        if not row:
+            continue
+
+        try:
+            if row[0] == 'thesis' and len(row) == 3:
+                yield n, ('thesis', row[1], BOOLEANS[row[2].lower()])
+
+            elif row[0] == 'relation' and len(row) == 4:
+                yield n, ('relation', RELATION_TYPES[row[1]], row[2], row[3])
+
+            elif row[0] == 'vote' and len(row) == 4:
+                yield n, ('vote', row[1], int(row[2]), row[3])
+
+            elif row[0] == 'vote' and len(row) == 6:
+                yield n, (
+                    'vote', row[1], int(row[2]),
+                    (RELATION_TYPES[row[3]], row[4], row[5]))
+
+            else:
+                raise LoadError(n, 'illegal row: %s' % row)
+
+        except LoadError:
+            raise
+
+        except (ValueError, KeyError) as e:
+            raise LoadError(n, 'illegal row: %r' % e) from e
+
+
+def load(records, problem):
+    """
+    Add (line number, record) pairs, as generated by the readers, to
+    problem and return it.
+
+    Records are checked once, when read, so objects are inserted through
+    the fast paths of the model, skipping the checks of add_thesis,
+    add_relation, upvote and downvote. Votes also go to the problem
+    vote store, if enabled.
+    """
+
+    theses = {t.content: t for t in problem.theses}
+    relations = {
+        (r.type, r.thesis1.content, r.thesis2.content): r
+        for r in problem.relations
+    }
+    users = {u.name: u for u in problem.voters}
+
+    for n, record in records:
+        kind = record[0]
+
+        if kind == 'vote':
+            _, name, vote, voted_key = record
+
+            # True == 1 and 1.0 == 1, but only ints are votes
+            if type(vote) is not int or vote not in (+1, -1):
+                raise LoadError(n, 'illegal vote: %r' % (vote,))
+
+            if type(name) is not str or not name:
+                raise LoadError(n, 'illegal user: %r' % (name,))
+
+            if type(voted_key) is tuple:
+                voted = relations.get(voted_key)
+            else:
+                voted = theses.get(voted_key)
+
+            if voted is None:
+                raise LoadError(n, 'unknown voted object: %s' % (voted_key,))
+
+            user = users.get(name)
+
+            if user is None:
+                user = users[name] = User(name)
+
+            voted._vote(user, vote)
+
+        elif kind == 'thesis':
+            _, content, is_solution = record
+
+            if type(content) is not str or not content or \
+                    type(is_solution) is not bool:
+                raise LoadError(n, 'illegal thesis')
+
+            if content not in theses:
+                thesis = theses[content] = Thesis(content, is_solution)
+
+                problem._insert_thesis(thesis)
+
+        else:
+            _, relation_type, content1, content2 = record
+
+            key = (relation_type, content1, content2)
+
+            if key in relations:
+                continue
+
+            try:
+                relation = Relation(
+                    relation_type, theses[content1], theses[content2])
+            except KeyError as e:
+                raise LoadError(n, 'unknown thesis: %s' % e) from e
+
+            relations[key] = relation
+
+            problem._insert_relation(relation)
+
+    return problem
+
+
+def load_file(path, problem):
+    """
+    Load a .jsonl or .csv file into problem and return it.
+    """
+
+    if path.endswith('.jsonl'):
+        reader = read_jsonl
+    elif path.endswith('.csv'):
+        reader = read_csv
+    else:
+        raise ValueError('unknown format: %s' % path)
+
+    with open(path, newline='') as f:
+        return load(reader(f), problem)
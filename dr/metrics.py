@@ -0,0 +1,58 @@
+"""
+Instrumentation hooks of Solver.
+
+A Solver reports to its metrics object:
+
+- timings, in seconds, of graph_analysis and contradictions while
+  constructing (and indexes, for dr.numpy_solver), and of every phase of
+  each iteration: all_users_strength, relations_strength,
+  theses_strength, contradictions_strength, users_strength;
+- counts: cyclic_theses, cones, cone_theses, cone_relations and
+  contradictions, once per graph analysis, iterations once per solve;
+- values: residual, once per iteration.
+
+The default Metrics ignores everything and is disabled: solvers skip
+reading the clock altogether.
+"""
+
+
+class Metrics:
+    enabled = False
+
+    def timing(self, name, seconds):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def value(self, name, value):
+        pass
+
+
+NO_METRICS = Metrics()
+
+
+class Recorder (Metrics):
+    """
+    Keep everything in memory: timings and values as lists, counts as
+    totals.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.timings = {}
+        self.counts = {}
+        self.values = {}
+
+    def timing(self, name, seconds):
+        self.timings.setdefault(name, []).append(seconds)
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def value(self, name, value):
+        self.values.setdefault(name, []).append(value)
+
+    def total(self, name):
+        return sum(self.timings.get(name, ()))
@@ -1,3 +1,21 @@
+import hashlib
+import itertools
+
+
+# fingerprints are sums, modulo 2 ** 64, of one stable hash per thesis,
+# relation and vote: they do not depend on insertion order and are updated
+# in constant time
+
+FINGERPRINT_MODULUS = 2 ** 64
+
+
+def _term(*parts):
+    return int.from_bytes(
+        hashlib.blake2b(
+            '\0'.join(parts).encode('utf-8'), digest_size=8).digest(),
+        'little')
+
+
 class User:
     def __init__(self, name):
         assert type(name) is str and len(name) > 0, 'illegal name'
@@ -24,32 +42,174 @@ class Problem:
         self.theses = set()
         self.relations = set()
 
+        # adjacency indexes, from thesis to relations
+        self.supporting_relations = {}  # incoming support relations
+        self.supported_relations = {}  # outgoing support relations
+        self.contradiction_relations = {}
+
+        # from user to voted theses and relations
+        self.voters = {}
+
+        # optional columnar copy of votes, see enable_vote_store
+        self.vote_store = None
+
+        # incremented by every change: new theses, relations and votes
+        self.revision = 0
+
+        # theses and relations, and votes, see _term
+        self.graph_fingerprint = 0
+        self.votes_fingerprint = 0
+
     def __str__(self):
         return 'P:"%s"' % self.question
 
+    @property
+    def fingerprint(self):
+        """
+        Order independent hash of theses, relations and votes: problems
+        with equal fingerprints are, barring collisions, solved alike.
+        """
+
+        return (self.graph_fingerprint + self.votes_fingerprint) % \
+            FINGERPRINT_MODULUS
+
+    def enable_vote_store(self):
+        """
+        Keep a columnar copy of every vote in a dr.votes.VoteStore, which
+        needs numpy. Votes already cast are copied.
+        """
+
+        from .votes import VoteStore
+
+        if self.vote_store is None:
+            self.vote_store = VoteStore()
+
+            for voted in itertools.chain(self.theses, self.relations):
+                self.vote_store.extend(
+                    (user, voted, vote)
+                    for user, vote in voted.votes.items()
+                )
+
+        return self.vote_store
+
     def add_thesis(self, thesis):
         assert isinstance(thesis, Thesis), 'illegal thesis'
 
+        self._insert_thesis(thesis)
+
+    def _insert_thesis(self, thesis):
+        if thesis in self.theses:
+            return
+
         self.theses.add(thesis)
+        self.revision += 1
+
+        self.graph_fingerprint = (
+            self.graph_fingerprint +
+            _term('T', thesis.content, 'S' if thesis.is_solution else '')
+        ) % FINGERPRINT_MODULUS
+
+        self.supporting_relations[thesis] = []
+        self.supported_relations[thesis] = []
+        self.contradiction_relations[thesis] = []
+
+        self._add_voted(thesis)
 
     def add_relation(self, relation):
         assert isinstance(relation, Relation), 'illegal relation'
         assert relation.thesis1 in self.theses, 'unknown thesis 1'
         assert relation.thesis2 in self.theses, 'unknown thesis 2'
 
+        self._insert_relation(relation)
+
+    def _insert_relation(self, relation):
+        if relation in self.relations:
+            return
+
         self.relations.add(relation)
+        self.revision += 1
+
+        self.graph_fingerprint = (
+            self.graph_fingerprint + _term('R', *self._voted_key(relation))
+        ) % FINGERPRINT_MODULUS
+
+        if relation.type is Relation.SUPPORT:
+            self.supported_relations[relation.thesis1].append(relation)
+            self.supporting_relations[relation.thesis2].append(relation)
+        else:
+            self.contradiction_relations[relation.thesis1].append(relation)
+            self.contradiction_relations[relation.thesis2].append(relation)
+
+        self._add_voted(relation)
 
+    def _add_voted(self, voted):
+        voted.problems.append(self)
 
-class Thesis:
+        for user, vote in voted.votes.items():
+            self._vote_cast(voted, user, vote)
+
+    def _vote_cast(self, voted, user, vote, previous=None):
+        self.voters.setdefault(user, set()).add(voted)
+        self.revision += 1
+
+        key = self._voted_key(voted)
+
+        fingerprint = self.votes_fingerprint + \
+            _term('V', user.name, str(vote), *key)
+
+        if previous is not None:
+            fingerprint -= _term('V', user.name, str(previous), *key)
+
+        self.votes_fingerprint = fingerprint % FINGERPRINT_MODULUS
+
+        if self.vote_store is not None:
+            self.vote_store.append(user, voted, vote)
+
+    def _voted_key(self, voted):
+        if voted in self.theses:
+            return ('T', voted.content)
+
+        return (
+            'S' if voted.type is Relation.SUPPORT else 'C',
+            voted.thesis1.content,
+            voted.thesis2.content,
+        )
+
+
+class Voted:
+    def __init__(self):
+        self.votes = dict()  # from users to -1/+1
+        self.problems = []
+
+    def upvote(self, user):
+        assert isinstance(user, User), 'illegal user'
+
+        self._vote(user, +1)
+
+    def downvote(self, user):
+        assert isinstance(user, User), 'illegal user'
+
+        self._vote(user, -1)
+
+    def _vote(self, user, vote):
+        previous = self.votes.get(user)
+
+        self.votes[user] = vote
+
+        for problem in self.problems:
+            problem._vote_cast(self, user, vote, previous)
+
+
+class Thesis (Voted):
     def __init__(self, content, is_solution):
         assert type(content) is str and len(content) > 0, 'illegal content'
         assert type(is_solution) is bool, 'illegal is_solution'
 
+        super().__init__()
+
         self.content = content
         self.is_solution = is_solution
 
-        self.votes = dict()  # from users to -1/+1
-
     def __eq__(self, other):
         return self is other or \
             isinstance(other, Thesis) and self.content == other.content
@@ -63,18 +223,8 @@ class Thesis:
             self.content,
         )
 
-    def upvote(self, user):
-        assert isinstance(user, User), 'illegal user'
-
-        self.votes[user] = +1
 
-    def downvote(self, user):
-        assert isinstance(user, User), 'illegal user'
-
-        self.votes[user] = -1
-
-
-class Relation:
+class Relation (Voted):
     SUPPORT = object()
     CONTRADICTION = object()
 
@@ -84,12 +234,12 @@ class Relation:
         assert isinstance(thesis1, Thesis), 'illegal thesis1'
         assert isinstance(thesis2, Thesis), 'illegal thesis2'
 
+        super().__init__()
+
         self.type = relation_type
         self.thesis1 = thesis1
         self.thesis2 = thesis2
 
-        self.votes = dict()  # from user to -1/+1
-
     def __eq__(self, other):
         return self is other or (
             isinstance(other, Relation) and
@@ -99,7 +249,7 @@ class Relation:
         )
 
     def __hash__(self):
-        return hash(self.type) + hash(self.thesis1) + hash(self.thesis2)
+        return hash((self.type, self.thesis1, self.thesis2))
 
     def __str__(self):
         return '%s%s%s' % (
@@ -107,13 +257,3 @@ class Relation:
             '->' if self.type is Relation.SUPPORT else '-x-',
             self.thesis2,
         )
-
-    def upvote(self, user):
-        assert isinstance(user, User), 'illegal user'
-
-        self.votes[user] = +1
-
-    def downvote(self, user):
-        assert isinstance(user, User), 'illegal user'
-
-        self.votes[user] = -1
@@ -0,0 +1,523 @@
+import logging
+
+import numpy
+
+from . import simple_solver
+from .convergence import FixedPoint
+from .tracing import Snapshot
+
+
+logger = logging.getLogger(__name__)
+
+
+class Solver(simple_solver.Solver):
+    """
+    Same contract as simple_solver.Solver, but users, theses and relations
+    are mapped to integer indices and every iteration phase is computed
+    with array operations.
+
+    Users are indexed by class, see simple_solver.Solver._group_users,
+    each class standing for all its users through its weight.
+
+    Votes are kept as sparse user x object matrices in coordinate form:
+    a pair of index arrays (voter, voted object) for theses and one for
+    relations.
+    """
+
+    def __init__(self, problem, error_threshold=.01, max_iterations=None,
+                 convergence=None, workers=1, metrics=None, tracer=None,
+                 analysis_cache=None, max_depth=None, epsilon=0):
+        super().__init__(problem, error_threshold, max_iterations, convergence,
+                         workers, metrics, tracer, analysis_cache, max_depth,
+                         epsilon)
+
+        self._timed('indexes', self._build_indexes)
+
+    def _build_indexes(self):
+        # integer indices, users standing for their classes
+
+        self.class_index = {
+            user_data: i for i, user_data in enumerate(self.user_classes)
+        }
+
+        representatives = {}
+
+        for user, user_data in self.users.items():
+            representatives.setdefault(user_data, user)
+
+        self.user_list = [representatives[d] for d in self.user_classes]
+        # the class of every user, in self.users order
+        self.user_class_positions = numpy.array(
+            [self.class_index[d] for d in self.users.values()],
+            dtype=numpy.intp)
+        self.thesis_list = list(self.theses_order)
+        self.relation_list = list(self.relations)
+
+        user_index = {u: i for i, u in enumerate(self.user_list)}
+        thesis_index = {t: i for i, t in enumerate(self.thesis_list)}
+        relation_index = {r: i for i, r in enumerate(self.relation_list)}
+
+        # sparse vote matrices
+
+        self.thesis_voters, self.thesis_voted = self._vote_matrix(
+            self.thesis_list, user_index)
+        self.relation_voters, self.relation_voted = self._vote_matrix(
+            self.relation_list, user_index)
+
+        # support edges grouped by the level of the supported thesis:
+        # a level only depends on the levels below it
+
+        edges = []
+
+        for i, thesis in enumerate(self.thesis_list):
+            thesis_data = self.theses_data[thesis]
+
+            for relation in thesis_data.supporting_relations:
+                edges.append((
+                    thesis_data.level,
+                    relation_index[relation],
+                    thesis_index[relation.thesis1],
+                    i,
+                ))
+
+        self.support_levels = []
+
+        for relations, sources, targets in self._group_by_level(edges):
+            targets, inverse = numpy.unique(targets, return_inverse=True)
+
+            self.support_levels.append((relations, sources, targets, inverse))
+
+        # support cones: every (cone, thesis) pair gets a position in the
+        # array of best path products. cone relations of all cones are
+        # grouped by level of their supported thesis and processed from the
+        # highest level down, as in SupportCone.best_products
+
+        positions = {}
+        apexes = []
+        cone_edges = []
+        frontier = []  # (cone number, position) of frontier theses
+
+        self.cone_size = 0
+
+        # when approximate, every contradiction relation has an error bound
+        # and needs its cones, see simple_solver
+        if self.approximate:
+            contradiction_relations = list(self.cones)
+        else:
+            contradiction_relations = {
+                c.contradiction_relation for c in self.contradictions
+            }
+
+        for cones in map(self.cones.get, contradiction_relations):
+            for cone in cones:
+                # cones are shared by apex, and so are their positions
+                if id(cone) in positions:
+                    continue
+
+                cone_positions = {}
+
+                for thesis in cone.theses:
+                    cone_positions[thesis] = self.cone_size
+                    self.cone_size += 1
+
+                frontier.extend(
+                    (len(apexes), cone_positions[t]) for t in cone.frontier)
+
+                positions[id(cone)] = cone_positions
+                apexes.append(cone_positions[cone.apex])
+
+                for relation in cone.relations:
+                    cone_edges.append((
+                        self.theses_data[relation.thesis2].level,
+                        cone_positions[relation.thesis1],
+                        cone_positions[relation.thesis2],
+                        relation_index[relation],
+                        thesis_index[relation.thesis1],
+                    ))
+
+        self.cone_apexes = numpy.array(apexes, dtype=numpy.intp)
+        self.cone_levels = self._group_by_level(cone_edges, reverse=True)
+
+        self.frontier_cones, self.frontier_positions = (
+            numpy.array(column, dtype=numpy.intp)
+            for column in (zip(*frontier) if frontier else ([], []))
+        )
+
+        # error bounds: contradiction relation, its theses and the cone
+        # numbers of its theses
+
+        cone_numbers = {
+            id_: i for i, id_ in enumerate(positions)
+        }
+
+        self.bound_relations = numpy.array(
+            [relation_index[r] for r in contradiction_relations],
+            dtype=numpy.intp)
+        self.bound_theses = numpy.array(
+            [
+                (thesis_index[r.thesis1], thesis_index[r.thesis2])
+                for r in contradiction_relations
+            ],
+            dtype=numpy.intp).reshape(-1, 2)
+        self.bound_cones = numpy.array(
+            [
+                [cone_numbers[id(cone)] for cone in self.cones[r]]
+                for r in contradiction_relations
+            ],
+            dtype=numpy.intp).reshape(-1, 2)
+        self.relation_errors = numpy.zeros(len(contradiction_relations))
+
+        # contradictions: the contradiction relation strength, the
+        # normalized strengths of its theses and the best products among
+        # the voted theses of both cones
+
+        contradiction_relations = []
+        contradiction_theses = []
+        candidates = ([], [])
+        candidates_starts = ([], [])
+
+        for contradiction in self.contradictions:
+            contradiction_relation = contradiction.contradiction_relation
+
+            contradiction_relations.append(
+                relation_index[contradiction_relation])
+            contradiction_theses.append((
+                thesis_index[contradiction_relation.thesis1],
+                thesis_index[contradiction_relation.thesis2],
+            ))
+
+            cones = self.cones[contradiction_relation]
+
+            for side, theses in enumerate(
+                [contradiction.theses1, contradiction.theses2]
+            ):
+                cone_positions = positions[id(cones[side])]
+
+                candidates_starts[side].append(len(candidates[side]))
+                candidates[side].extend(cone_positions[t] for t in theses)
+
+        self.contradiction_relations = numpy.array(
+            contradiction_relations, dtype=numpy.intp)
+        self.contradiction_theses = numpy.array(
+            contradiction_theses, dtype=numpy.intp).reshape(-1, 2)
+        self.contradiction_candidates = [
+            numpy.array(c, dtype=numpy.intp) for c in candidates
+        ]
+        self.contradiction_candidates_starts = [
+            numpy.array(c, dtype=numpy.intp) for c in candidates_starts
+        ]
+
+        # (user, contradiction) pairs
+
+        contradiction_index = {
+            id(c): i for i, c in enumerate(self.contradictions)
+        }
+        pairs = [
+            (i, contradiction_index[id(c)])
+            for i, user in enumerate(self.user_list)
+            for c in self.users[user].contradictions.values()
+        ]
+
+        self.contradiction_users, self.user_contradictions = (
+            numpy.array(column, dtype=numpy.intp)
+            for column in (zip(*pairs) if pairs else ([], []))
+        )
+
+        # sorted by content: argmax picks the first maximum, so ties are
+        # broken as in simple_solver
+        self.solutions = numpy.array(
+            sorted(
+                (i for i, t in enumerate(self.thesis_list) if t.is_solution),
+                key=lambda i: self.thesis_list[i].content
+            ),
+            dtype=numpy.intp)
+
+        # strengths
+
+        self.users_strength = numpy.array(
+            [self.users[u].strength for u in self.user_list], dtype=float)
+        self.users_next_strength = numpy.array(
+            [self.users[u].next_strength for u in self.user_list],
+            dtype=float)
+        self.users_weight = numpy.array(
+            [self.users[u].weight for u in self.user_list], dtype=float)
+        self.theses_strength = numpy.zeros(len(self.thesis_list))
+        self.relations_strength = numpy.zeros(len(self.relation_list))
+        self.contradictions_strength = numpy.ones(len(self.contradictions))
+
+    def _group_by_level(self, rows, reverse=False):
+        # split (level, column...) rows in a list of column arrays, one for
+        # each level
+
+        rows.sort(key=lambda row: row[0], reverse=reverse)
+
+        groups = []
+        start = 0
+
+        while start < len(rows):
+            level = rows[start][0]
+            end = start
+
+            while end < len(rows) and rows[end][0] == level:
+                end += 1
+
+            groups.append(tuple(
+                numpy.array(column, dtype=numpy.intp)
+                for column in zip(*[row[1:] for row in rows[start:end]])
+            ))
+
+            start = end
+
+        return groups
+
+    def _vote_matrix(self, voted_objects, user_index):
+        if self.problem.vote_store is not None:
+            return self._vote_store_matrix(voted_objects, user_index)
+
+        voters = []
+        voted = []
+
+        for i, voted_object in enumerate(voted_objects):
+            for user_data in self.voted_classes.get(voted_object, ()):
+                voters.append(self.class_index[user_data])
+                voted.append(i)
+
+        return (
+            numpy.array(voters, dtype=numpy.intp),
+            numpy.array(voted, dtype=numpy.intp),
+        )
+
+    def _vote_store_matrix(self, voted_objects, user_index):
+        # read the votes columns in bulk and only translate ids. users not
+        # standing for their class are dropped: their votes are the same
+
+        store = self.problem.vote_store
+
+        users, objects, signs = store.columns()
+
+        user_map = numpy.full(len(store.users), -1, dtype=numpy.intp)
+
+        for user, i in user_index.items():
+            user_id = store.user_ids.get(user)
+
+            if user_id is not None:
+                user_map[user_id] = i
+
+        object_map = numpy.full(len(store.objects), -1, dtype=numpy.intp)
+
+        for i, voted_object in enumerate(voted_objects):
+            object_id = store.object_ids.get(voted_object)
+
+            if object_id is not None:
+                object_map[object_id] = i
+
+        voters = user_map[users]
+        voted = object_map[objects]
+        known = (voters >= 0) & (voted >= 0)
+
+        return voters[known], voted[known]
+
+    def apply_votes(self, votes):
+        # strengths live in arrays: publish them before the simple_solver
+        # objects are updated, then index everything again
+        self._store_strengths()
+
+        super().apply_votes(votes)
+
+        self._build_indexes()
+
+    def warm_start(self, strengths):
+        super().warm_start(strengths)
+
+        self.users_next_strength = self.users_next_strength.copy()
+
+        for user, strength in strengths.items():
+            self.users_next_strength[self.class_index[self.users[user]]] = \
+                strength
+
+    def solve(self, deadline=None, time_budget=None):
+        solution = super().solve(deadline, time_budget)
+
+        self._store_strengths()
+
+        return solution
+
+    def iter_solve(self, top_k=5, deadline=None, time_budget=None):
+        try:
+            yield from super().iter_solve(top_k, deadline, time_budget)
+        finally:
+            self._store_strengths()
+
+    def _calc_all_users_strength(self):
+        self.users_strength = self.users_next_strength
+        self.users_weighted_strength = self.users_strength * self.users_weight
+
+        self.all_users_strength = self.users_weighted_strength.sum()
+
+        logger.debug('users strength: %s', self.all_users_strength)
+
+    def _direct_votes_strength_array(self, voters, voted, size):
+        votes = numpy.bincount(
+            voted, weights=self.users_weighted_strength[voters],
+            minlength=size)
+
+        return numpy.divide(
+            votes, self.all_users_strength,
+            out=numpy.zeros(size), where=votes > 0)
+
+    def _calc_relations_strength(self):
+        self.relations_strength = self._direct_votes_strength_array(
+            self.relation_voters, self.relation_voted,
+            len(self.relation_list))
+
+    def _calc_theses_strength(self):
+        strength = self._direct_votes_strength_array(
+            self.thesis_voters, self.thesis_voted, len(self.thesis_list))
+
+        supported = strength > 0
+
+        for relations, sources, targets, inverse in self.support_levels:
+            contributions = numpy.bincount(
+                inverse,
+                weights=self.relations_strength[relations] *
+                strength[sources],
+                minlength=len(targets))
+
+            strength[targets] += contributions * supported[targets]
+
+        self.theses_strength = strength
+        self.max_theses_strength = strength.max(initial=0)
+
+        logger.debug('max theses strength: %s', self.max_theses_strength)
+
+    def _calc_contradictions_strength(self):
+        if not self.contradictions and not len(self.bound_relations):
+            return
+
+        normalized = numpy.divide(
+            self.theses_strength, self.max_theses_strength,
+            out=numpy.zeros(len(self.thesis_list)),
+            where=self.max_theses_strength > 0)
+
+        best = numpy.zeros(self.cone_size)
+        best[self.cone_apexes] = 1
+
+        for sources, targets, relations, theses in self.cone_levels:
+            products = best[targets] * self.relations_strength[relations] * \
+                normalized[theses]
+
+            if self.epsilon:
+                # dropped paths, as in SupportCone.best_products
+                products[products < self.epsilon] = 0
+
+            numpy.maximum.at(best, sources, products)
+
+        if self.approximate:
+            self._calc_relation_errors(normalized, best)
+
+        if not self.contradictions:
+            return
+
+        strength = self.relations_strength[self.contradiction_relations] * \
+            normalized[self.contradiction_theses[:, 0]] * \
+            normalized[self.contradiction_theses[:, 1]]
+
+        for candidates, starts in zip(
+            self.contradiction_candidates,
+            self.contradiction_candidates_starts
+        ):
+            strength *= numpy.maximum.reduceat(best[candidates], starts)
+
+        self.contradictions_strength = 1 - strength
+
+    def _calc_relation_errors(self, normalized, best):
+        errors = numpy.full(len(self.cone_apexes), float(self.epsilon))
+
+        numpy.maximum.at(
+            errors, self.frontier_cones, best[self.frontier_positions])
+
+        self.relation_errors = \
+            self.relations_strength[self.bound_relations] * \
+            normalized[self.bound_theses[:, 0]] * \
+            normalized[self.bound_theses[:, 1]] * \
+            (errors[self.bound_cones[:, 0]] + errors[self.bound_cones[:, 1]])
+
+    def _error_bound(self):
+        return min(1, float(self.relation_errors.sum()))
+
+    def _calc_users_strength(self):
+        strength = numpy.ones(len(self.user_list))
+
+        numpy.multiply.at(
+            strength, self.contradiction_users,
+            self.contradictions_strength[self.user_contradictions])
+
+        self.users_next_strength = strength
+
+    def _snapshot(self, residual):
+        return Snapshot(
+            self.iteration,
+            residual,
+            dict(zip(
+                self.users,
+                self.users_next_strength[self.user_class_positions].tolist())),
+            dict(zip(self.thesis_list, self.theses_strength.tolist())),
+            dict(zip(self.relation_list, self.relations_strength.tolist())),
+        )
+
+    def _residual(self):
+        error = (self.users_next_strength - self.users_strength) ** 2
+
+        return float(error.max(initial=0))
+
+    def _accelerate(self):
+        if type(self.convergence) is FixedPoint:
+            return
+
+        # one entry per user, as in simple_solver
+        positions = self.user_class_positions
+
+        strengths = self.convergence.accelerate(
+            self.users_strength[positions].tolist(),
+            self.users_next_strength[positions].tolist()
+        )
+
+        self.users_next_strength = numpy.empty(len(self.user_list))
+        self.users_next_strength[positions] = strengths
+
+    def _ranking(self, k):
+        strength = self.theses_strength[self.solutions]
+
+        # stable: solutions are sorted by content, as ties want
+        top = numpy.argsort(-strength, kind='stable')[:k]
+
+        return [
+            (self.thesis_list[self.solutions[i]], float(strength[i]))
+            for i in top
+        ]
+
+    def _find_strongest_solution(self):
+        if not len(self.solutions):
+            return None
+
+        best = numpy.argmax(self.theses_strength[self.solutions])
+
+        return self.thesis_list[self.solutions[best]]
+
+    def _store_strengths(self):
+        # publish array strengths through the simple_solver data objects
+
+        for i, user in enumerate(self.user_list):
+            user_data = self.users[user]
+            user_data.strength = float(self.users_strength[i])
+            user_data.next_strength = float(self.users_next_strength[i])
+
+        for i, thesis in enumerate(self.thesis_list):
+            self.theses_data[thesis].strength = float(self.theses_strength[i])
+
+        for i, relation in enumerate(self.relation_list):
+            self.relations[relation].strength = float(
+                self.relations_strength[i])
+
+        for i, contradiction in enumerate(self.contradictions):
+            contradiction.strength = float(self.contradictions_strength[i])
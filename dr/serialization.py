@@ -0,0 +1,101 @@
+"""
+Compact, picklable encoding of a Problem, used to ship problems to
+worker processes.
+
+A problem becomes a tuple of plain values: question, theses as
+(content, is_solution) pairs, relations as (type code, thesis index,
+thesis index) triples, user names and votes as three array columns of
+voted object index, user index and sign. Voted objects are indexed
+theses first, then relations.
+
+The theses order is returned by encode too, so that indexes computed on
+the decoded problem can be mapped back to the original theses.
+"""
+
+from array import array
+
+from .model import Thesis, Relation, User, Problem
+
+
+SUPPORT = 0
+CONTRADICTION = 1
+
+
+def encode(problem):
+    """
+    Return (data, theses): data is the encoding of problem and theses the
+    list of problem theses in encoding order.
+    """
+
+    theses = list(problem.theses)
+    relations = list(problem.relations)
+
+    thesis_index = {t: i for i, t in enumerate(theses)}
+    user_index = {}
+
+    vote_objects = array('q')
+    vote_users = array('q')
+    vote_signs = array('b')
+
+    for i, voted in enumerate(theses + relations):
+        for user, vote in voted.votes.items():
+            vote_objects.append(i)
+            vote_users.append(user_index.setdefault(user, len(user_index)))
+            vote_signs.append(vote)
+
+    data = (
+        problem.question,
+        [(t.content, t.is_solution) for t in theses],
+        [
+            (
+                SUPPORT if r.type is Relation.SUPPORT else CONTRADICTION,
+                thesis_index[r.thesis1],
+                thesis_index[r.thesis2],
+            )
+            for r in relations
+        ],
+        [u.name for u in user_index],
+        vote_objects,
+        vote_users,
+        vote_signs,
+    )
+
+    return data, theses
+
+
+def decode(data):
+    """
+    Return (problem, theses), theses in encoding order.
+    """
+
+    question, theses_data, relations_data, names, vote_objects, \
+        vote_users, vote_signs = data
+
+    problem = Problem(question)
+
+    theses = [Thesis(content, is_solution)
+              for content, is_solution in theses_data]
+    relations = [
+        Relation(
+            Relation.SUPPORT if code == SUPPORT else Relation.CONTRADICTION,
+            theses[i1],
+            theses[i2],
+        )
+        for code, i1, i2 in relations_data
+    ]
+    users = [User(name) for name in names]
+
+    voted_objects = theses + relations
+
+    # votes are set before adding objects to the problem, which indexes
+    # them on insertion
+    for i, u, sign in zip(vote_objects, vote_users, vote_signs):
+        voted_objects[i].votes[users[u]] = sign
+
+    for thesis in theses:
+        problem.add_thesis(thesis)
+
+    for relation in relations:
+        problem.add_relation(relation)
+
+    return problem, theses
@@ -0,0 +1,201 @@
+"""
+asyncio tally service: answers "current winner" queries for live
+problems, solving them in an executor.
+
+Concurrent requests for the same problem share one in-flight solve.
+While a problem is being solved again, reads get the last completed
+result, marked stale, unless they ask for a fresh one. At most
+max_pending solves are queued or running: beyond that, requests needing
+a solve fail with Busy.
+
+Problems are encoded in the event loop thread, see dr.serialization, and
+solved on the copy, so they can keep changing while being solved.
+
+serve() exposes a service on a unix socket, one JSON object per line:
+
+    -> {"problem": "p1", "fresh": false}
+    <- {"problem": "p1", "winner": "t1", "revision": 12, "stale": false}
+    <- {"problem": "p1", "error": "busy"}
+    <- {"problem": "p1", "error": "solve failed"}
+"""
+
+import asyncio
+import functools
+import json
+import logging
+
+from . import serialization
+from . import simple_solver
+from .batch import solve_encoded
+
+
+logger = logging.getLogger(__name__)
+
+
+class Busy (Exception):
+    pass
+
+
+class Tally:
+    def __init__(self, winner, revision, stale):
+        self.winner = winner  # a thesis, or None
+        self.revision = revision  # problem revision the winner refers to
+        self.stale = stale  # the problem changed since
+
+
+class TallyService:
+    def __init__(self, executor=None, max_pending=16,
+                 solver=simple_solver.Solver, error_threshold=.01,
+                 max_iterations=100):
+        assert max_pending > 0, 'illegal max_pending'
+
+        # None is the event loop default executor
+        self.executor = executor
+        self.max_pending = max_pending
+        self.solve = functools.partial(
+            solve_encoded,
+            solver=solver,
+            error_threshold=error_threshold,
+            max_iterations=max_iterations)
+
+        self.problems = {}
+        self.results = {}  # from problem id to (revision, winner)
+        self.in_flight = {}  # from problem id to solve task
+
+    def register(self, problem_id, problem):
+        self.problems[problem_id] = problem
+        self.results.pop(problem_id, None)
+
+    def unregister(self, problem_id):
+        del self.problems[problem_id]
+        self.results.pop(problem_id, None)
+
+    async def winner(self, problem_id, fresh=False):
+        """
+        Return the Tally of problem_id. Unless fresh, a stale tally is
+        returned, if any, instead of waiting for a new solve.
+        """
+
+        problem = self.problems[problem_id]
+
+        result = self.results.get(problem_id)
+
+        if result is not None and result[0] == problem.revision:
+            return Tally(result[1], result[0], False)
+
+        try:
+            task = self._refresh(problem_id)
+        except Busy:
+            # a stale result beats no result
+            if result is None or fresh:
+                raise
+
+            return Tally(result[1], result[0], True)
+
+        if result is not None and not fresh:
+            return Tally(result[1], result[0], True)
+
+        revision, winner = await asyncio.shield(task)
+
+        if fresh and revision != problem.revision:
+            # the solve in flight started before the last changes
+            revision, winner = await asyncio.shield(
+                self._refresh(problem_id))
+
+        return Tally(winner, revision, revision != problem.revision)
+
+    def _refresh(self, problem_id):
+        task = self.in_flight.get(problem_id)
+
+        if task is not None:
+            return task
+
+        if len(self.in_flight) >= self.max_pending:
+            raise Busy(problem_id)
+
+        problem = self.problems[problem_id]
+
+        task = asyncio.ensure_future(
+            self._solve(problem_id, problem, problem.revision,
+                        *serialization.encode(problem)))
+
+        self.in_flight[problem_id] = task
+        task.add_done_callback(functools.partial(self._done, problem_id))
+
+        return task
+
+    def _done(self, problem_id, task):
+        del self.in_flight[problem_id]
+
+        if not task.cancelled() and task.exception() is not None:
+            logger.error('solve failed: problem=%s', problem_id,
+                         exc_info=task.exception())
+
+    async def _solve(self, problem_id, problem, revision, data, theses):
+        loop = asyncio.get_running_loop()
+
+        index = await loop.run_in_executor(self.executor, self.solve, data)
+
+        result = (revision, None if index is None else theses[index])
+
+        # the problem could have been unregistered or replaced meanwhile
+        if self.problems.get(problem_id) is problem:
+            self.results[problem_id] = result
+
+        logger.debug('solved: problem=%s, revision=%s', problem_id, revision)
+
+        return result
+
+    async def handle(self, reader, writer):
+        # serve requests of a connection, one at a time
+        try:
+            while True:
+                line = await reader.readline()
+
+                if not line:
+                    break
+
+                writer.write(
+                    json.dumps(await self._answer(line)).encode('utf-8') +
+                    b'\n')
+
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _answer(self, line):
+        try:
+            request = json.loads(line)
+            problem_id = request['problem']
+        except (ValueError, KeyError, TypeError):
+            return {'error': 'illegal request'}
+
+        response = {'problem': problem_id}
+
+        if type(problem_id) is not str or problem_id not in self.problems:
+            response['error'] = 'unknown problem'
+            return response
+
+        try:
+            tally = await self.winner(
+                problem_id, bool(request.get('fresh', False)))
+        except Busy:
+            response['error'] = 'busy'
+        except Exception:
+            # logged by _done
+            response['error'] = 'solve failed'
+        else:
+            response['winner'] = tally.winner and tally.winner.content
+            response['revision'] = tally.revision
+            response['stale'] = tally.stale
+
+        return response
+
+
+async def serve(service, path):
+    """
+    Start serving service on the unix socket path and return the
+    asyncio server.
+    """
+
+    return await asyncio.start_unix_server(service.handle, path)
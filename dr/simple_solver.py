@@ -1,24 +1,40 @@
+import heapq
 import logging
-
+import time
+
+from .analysis import GraphAnalysis
+from .contradictions import SupportCone, discover_contradictions
+from .convergence import ConvergenceReport, FixedPoint
+from .graph import (
+    reachable, strongly_connected_components, topological_levels
+)
+from .metrics import NO_METRICS
 from .model import Relation
-from .utils import dump_path
+from .tracing import Snapshot
 
 
 logger = logging.getLogger(__name__)
 
 
+# below this many contradiction relations, discovery is not worth a pool
+MIN_PARALLEL_RELATIONS = 64
+
+
 class UserData:
     def __init__(self):
         self.strength = 0
         self.contradictions = {}
         self.next_strength = 1
+        self.weight = 1  # users sharing this data, see _group_users
 
 
 class ThesisData:
     def __init__(self):
         self.strength = 0
         self.supporting_relations = []
-        self.taken = False
+        self.supported_relations = []
+        self.level = 0
+        self.position = 0  # in theses_order
 
 
 class RelationData:
@@ -27,58 +43,87 @@ class RelationData:
 
 
 class Contradiction:
-    def __init__(self, contradiction_relation, path1=None, path2=None):
+    def __init__(self, contradiction_relation, theses1, theses2):
         self.contradiction_relation = contradiction_relation
-        self.path1 = path1
-        self.path2 = path2
-
+        # voted theses supporting, directly or not, contradiction_relation
+        # thesis1 (thesis2), or thesis1 (thesis2) itself
+        self.theses1 = theses1
+        self.theses2 = theses2
+        self.strength = 1
+        self.users = set()
 
-class Path:
-    def __init__(self, *support_relations):
-        self.path = support_relations
 
-    @property
-    def first_thesis(self):
-        return self.path[-1].thesis1
+class Progress:
+    def __init__(self, iteration, leader, ranking, residual, converged):
+        self.iteration = iteration
+        self.leader = leader  # strongest solution so far, or None
+        self.ranking = ranking  # top (solution, strength), strongest first
+        self.residual = residual
+        self.converged = converged
 
-    @property
-    def last_thesis(self):
-        return self.path[0].thesis2
 
-    def __contains__(self, thesis):
-        for rel in self.path:
-            if rel.thesis2 == thesis:
-                return True
+class DirtySet:
+    """
+    What changed since the last iteration, and so must be recomputed.
 
-        return rel.thesis1 == thesis
+    When everything is set, every phase recomputes everything: that is
+    the case on the first iteration and whenever a global normalization
+    factor (sum of users strength, max thesis strength) changes.
+    """
 
-    def grow(self, relation):
-        return Path(*self.path, relation)
+    def __init__(self):
+        self.everything = True
+        self.users = set()
+        self.relations = set()
+        self.theses = set()
+        self.contradictions = set()
 
-    def __str__(self):
-        return self.path[-1].thesis1.content + '->' + '->'.join(
-            [p.thesis2.content for p in reversed(self.path)])
+    def clear(self):
+        self.everything = False
+        self.users.clear()
+        self.relations.clear()
+        self.theses.clear()
+        self.contradictions.clear()
 
 
 class Solver:
-    def __init__(self, problem, error_threshold=.01):
+    def __init__(self, problem, error_threshold=.01, max_iterations=None,
+                 convergence=None, workers=1, metrics=None, tracer=None,
+                 analysis_cache=None, max_depth=None, epsilon=0):
+        assert max_iterations is None or max_iterations > 0, \
+            'illegal max_iterations'
+        assert workers > 0, 'illegal workers'
+        assert max_depth is None or max_depth >= 0, 'illegal max_depth'
+        assert 0 <= epsilon <= 1, 'illegal epsilon'
+
         self.problem = problem
         self.error_threshold = error_threshold
+        self.max_iterations = max_iterations
+        # a dr.convergence strategy, plain fixed point iteration by default
+        self.convergence = convergence or FixedPoint()
+        # processes discovering contradictions, see _find_users_contradictions
+        self.workers = workers
+        # a dr.metrics.Metrics
+        self.metrics = metrics or NO_METRICS
+        # a dr.tracing.Tracer, or None
+        self.tracer = tracer
+        # a dr.analysis.AnalysisCache, or None
+        self.analysis_cache = analysis_cache
+        # approximate contradictions: support paths longer than max_depth,
+        # or whose product falls below epsilon, are ignored
+        self.max_depth = max_depth
+        self.epsilon = epsilon
+        self.approximate = max_depth is not None or epsilon > 0
 
         # collect all users and set their strength to default 1
 
-        self.users = {
-            u: UserData()
-            for u in [
-                u
-                for thesis in problem.theses
-                for u in thesis.votes
-            ] + [
-                u
-                for relation in problem.relations
-                for u in relation.votes
-            ]
-        }
+        self.users = {}
+        self.user_classes = []
+        # from thesis (relation) to the user classes voting it, as the keys
+        # of a dict: ordered, so that sums do not depend on hashing
+        self.voted_classes = {}
+
+        self._group_users()
 
         self.all_users_strength = len(self.users)
 
@@ -90,7 +135,9 @@ class Solver:
         }
 
         self.theses_order = None
+        self.theses_levels = None
         self.max_theses_strength = 0
+        self.strongest_thesis = None
 
         self.relations = {
             relation: RelationData()
@@ -98,328 +145,906 @@ class Solver:
         }
 
         self.contradictions = []
+        self.cones = {}
+        # contradiction relations sharing a thesis share its cone
+        self.apex_cones = {}
+        # from contradiction relation to the bound of the error its
+        # contradictions strengths have, when approximate
+        self.contradiction_errors = {}
+
+        # incremental computation state: users whose strength is going to
+        # change in the next iteration, and what must be recomputed
+
+        self.moving_users = set(self.user_classes)
+        self.dirty = DirtySet()
 
         logger.info(
             'problem to solve: question=%s, theses=%s, '
-            'relations=%s, voters=%s',
+            'relations=%s, voters=%s, classes=%s',
             problem.question,
             len(self.theses_data),
             len(self.relations),
-            len(self.users)
+            len(self.users),
+            len(self.user_classes)
         )
 
-        self._analyze_theses_graph()
+        analysis = None
+
+        if analysis_cache is not None:
+            analysis = analysis_cache.get(problem)
+
+        if analysis is None:
+            self._timed('graph_analysis', self._analyze_theses_graph)
+        else:
+            self._use_graph_analysis(analysis)
+
+        self._timed('contradictions', self._find_users_contradictions)
 
-        self._find_users_contradictions()
+        if analysis_cache is not None and analysis is None:
+            analysis_cache.put(self._graph_analysis())
+
+        self._count_graph()
 
         logger.debug('contradictions: found=%s', len(self.contradictions))
 
         # stats
 
         self.iteration = 0
+        self.report = None  # ConvergenceReport of the last solve
 
-    def solve(self):
+    def solve(self, deadline=None, time_budget=None):
         """
         Calculate theses strengths and return the one with greater strength
         that is also a solution.
+
+        Iteration stops when converged, when no user has strength left,
+        after max_iterations or, with a deadline (a time.monotonic() value)
+        or a time_budget in seconds, after the first iteration ending late:
+        self.report tells whether it converged.
+        """
+
+        for _ in self._run(deadline, time_budget):
+            pass
+
+        return self._find_strongest_solution()
+
+    def iter_solve(self, top_k=5, deadline=None, time_budget=None):
         """
+        Like solve, but a generator yielding a Progress after every
+        iteration, with the top_k solutions so far.
+        """
+
+        for report in self._run(deadline, time_budget):
+            ranking = self._ranking(top_k)
+
+            yield Progress(
+                self.iteration,
+                ranking[0][0] if ranking else self._find_strongest_solution(),
+                ranking,
+                report.residual,
+                report.converged,
+            )
+
+    def _run(self, deadline, time_budget):
+        # iterate, yielding the report after every iteration
+
+        if time_budget is not None:
+            budget_deadline = time.monotonic() + time_budget
+
+            if deadline is None or budget_deadline < deadline:
+                deadline = budget_deadline
+
+        self.convergence.reset()
+        self.report = report = ConvergenceReport()
 
         while True:
             self.iteration += 1
+            report.iterations += 1
 
             logger.debug('iteration: n=%s', self.iteration)
 
             self._iterate()
 
-            if self._converged():
+            if self.approximate:
+                report.error_bound = self._error_bound()
+
+            report.residual = self._residual()
+            report.residuals.append(report.residual)
+
+            self.metrics.value('residual', report.residual)
+
+            if self.tracer is not None:
+                self.tracer.record(self._snapshot(report.residual))
+
+            report.converged = report.residual <= self.error_threshold
+
+            yield report
+
+            if report.converged:
                 break
 
-        return self._find_strongest_solution()
+            # every user is fully inconsistent: nothing has strength, so
+            # every contradiction is void and users would bounce back to
+            # 1, then to 0 again, forever
+            if not self.all_users_strength:
+                logger.warning('no users strength: iterations=%s',
+                               report.iterations)
+                break
+
+            if report.iterations == self.max_iterations:
+                logger.warning('not converged: iterations=%s, residual=%s',
+                               report.iterations, report.residual)
+                break
+
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning('deadline: iterations=%s, residual=%s',
+                               report.iterations, report.residual)
+                break
+
+            self._accelerate()
+
+        self.metrics.count('iterations', report.iterations)
+
+    def apply_votes(self, votes):
+        """
+        Cast votes, an iterable of (thesis or relation, user, +1/-1), and
+        update users and their contradictions accordingly.
+
+        The graph analysis is reused, and so are user strengths: call
+        resolve() to iterate again from where the last solve stopped.
+        """
+
+        for voted, user, vote in votes:
+            assert voted in self.theses_data or voted in self.relations, \
+                'unknown voted object'
+            assert vote in (+1, -1), 'illegal vote'
+
+            self._ungroup_user(user)
+
+            user_data = self.users[user]
+
+            self.voted_classes.setdefault(voted, {})[user_data] = None
+
+            if vote > 0:
+                voted.upvote(user)
+            else:
+                voted.downvote(user)
+
+            self.dirty.users.add(user_data)
+
+            if voted in self.theses_data:
+                self.dirty.theses.add(voted)
+
+                for relation in self.theses_cones.get(voted, ()):
+                    self._update_user_contradiction(user, relation)
+            else:
+                self.dirty.relations.add(voted)
+
+    def resolve(self, deadline=None, time_budget=None):
+        """
+        Like solve, but meant to be called after apply_votes: iteration
+        starts from the user strengths of the previous solve instead of 1.
+        """
+
+        return self.solve(deadline, time_budget)
+
+    def warm_start(self, strengths):
+        """
+        Start the next solve from strengths, a dict from user to strength,
+        for instance the result of a previous solve of the same problem.
+        """
+
+        for user, strength in strengths.items():
+            user_data = self.users[user]
+            user_data.next_strength = strength
+            self.moving_users.add(user_data)
+
+    def _group_users(self):
+        # users casting the same votes have the same contradictions, and so
+        # the same strength: they share one UserData, weighted by their
+        # number, computed once per iteration
+
+        classes = {}
+
+        for user, voted in self.problem.voters.items():
+            signature = frozenset((v, v.votes[user]) for v in voted)
+
+            user_data = classes.get(signature)
+
+            if user_data is None:
+                user_data = classes[signature] = UserData()
+                user_data.weight = 0
+
+                self.user_classes.append(user_data)
+
+                for v in voted:
+                    self.voted_classes.setdefault(v, {})[user_data] = None
+
+            user_data.weight += 1
+            self.users[user] = user_data
+
+    def _ungroup_user(self, user):
+        # user is about to vote: give it a class of its own
+
+        user_data = self.users.get(user)
+
+        if user_data is None:
+            user_data = self.users[user] = UserData()
+            self.user_classes.append(user_data)
+            self.moving_users.add(user_data)
+
+            return
+
+        if user_data.weight == 1:
+            return
+
+        user_data.weight -= 1
+
+        own = self.users[user] = UserData()
+        own.strength = user_data.strength
+        own.next_strength = user_data.next_strength
+        own.contradictions = dict(user_data.contradictions)
+
+        for contradiction in own.contradictions.values():
+            contradiction.users.add(own)
+
+        for voted in self.problem.voters[user]:
+            self.voted_classes[voted][own] = None
+
+        self.user_classes.append(own)
+
+        if user_data in self.moving_users:
+            self.moving_users.add(own)
 
     def _analyze_theses_graph(self):
         # collect all supporting theses
 
-        paths = []
+        for thesis, thesis_data in self.theses_data.items():
+            thesis_data.supporting_relations = list(
+                self.problem.supporting_relations[thesis])
 
-        for relation in self.relations:
-            if relation.type is Relation.SUPPORT:
-                self.theses_data[relation.thesis2].supporting_relations.append(
-                    relation)
+        def successors(thesis):
+            return [
+                r.thesis2
+                for r in self.problem.supported_relations[thesis]
+            ]
 
-                paths.append(Path(relation))
+        # find cycles: a thesis is cyclic if its strongly connected component
+        # has more than one thesis or it supports itself
 
-                logger.debug('path found: path=%s', paths[-1])
+        cyclic_theses = []
 
-        # find cycles
+        for component in strongly_connected_components(
+            self.theses_data, successors
+        ):
+            thesis = component[0]
 
-        cycles = []
+            if len(component) > 1 or thesis in successors(thesis):
+                cyclic_theses.extend(component)
 
-        while paths:
-            new_paths = []
+                self.metrics.count('cyclic_theses', len(component))
 
-            for path in paths:
-                thesis = path.first_thesis
-                thesis_data = self.theses_data[thesis]
+                logger.debug('cycle found: theses=%s', len(component))
 
-                for relation in thesis_data.supporting_relations:
-                    new_path = path.grow(relation)
+        # remove supporting_relations that form cycles, that is every support
+        # relation whose supporting thesis belongs to a cycle or is supported
+        # by one, directly or not
 
-                    if relation.thesis1 in path:
-                        cycles.append(new_path)
-                        logger.debug('cycle found: path=%s', new_path)
-                    else:
-                        new_paths.append(new_path)
-                        logger.debug('path found: path=%s', new_path)
+        tainted_theses = reachable(cyclic_theses, successors)
 
-            paths = new_paths
+        if tainted_theses:
+            for thesis_data in self.theses_data.values():
+                thesis_data.supporting_relations = [
+                    r
+                    for r in thesis_data.supporting_relations
+                    if r.thesis1 not in tainted_theses
+                ]
 
-        # remove supporting_relations that form cycles
+        # calc theses order, level by level: a thesis comes after every
+        # thesis supporting it
 
-        relations_to_remove = {
-            r
-            for path in cycles
-            for r in path.path
-        }
+        self.theses_levels = topological_levels(
+            self.theses_data,
+            lambda thesis: [
+                r.thesis1
+                for r in self.theses_data[thesis].supporting_relations
+            ]
+        )
 
-        for relation in relations_to_remove:
-            thesis2_data = self.theses_data[relation.thesis2]
+        self.theses_order = []
 
-            thesis2_data.supporting_relations = list(
-                filter(
-                    lambda x: x != relation,
-                    thesis2_data.supporting_relations
-                )
-            )
+        for level, theses in enumerate(self.theses_levels):
+            for thesis in theses:
+                self.theses_data[thesis].level = level
 
-        # calc theses order
+            self.theses_order.extend(theses)
 
-        self.theses_order = []
+        for position, thesis in enumerate(self.theses_order):
+            thesis_data = self.theses_data[thesis]
+            thesis_data.position = position
 
-        theses_count = len(self.theses_data)
+            for relation in thesis_data.supporting_relations:
+                self.theses_data[relation.thesis1].supported_relations.append(
+                    relation)
 
-        while theses_count > len(self.theses_order):
-            for thesis, thesis_data in self.theses_data.items():
-                if thesis_data.taken:
-                    continue
+    def _graph_analysis(self):
+        return GraphAnalysis(
+            self.problem,
+            self.theses_order,
+            self.theses_levels,
+            {
+                thesis: (
+                    thesis_data.supporting_relations,
+                    thesis_data.supported_relations,
+                    thesis_data.level,
+                    thesis_data.position,
+                )
+                for thesis, thesis_data in self.theses_data.items()
+            },
+            self.apex_cones,
+            self.max_depth,
+        )
 
-                if not thesis_data.supporting_relations:
-                    thesis_data.taken = True
-                    self.theses_order.append(thesis)
-                    continue
+    def _use_graph_analysis(self, analysis):
+        # analyses are shared: nothing here is modified after the analysis
 
-                collectable = True
+        self.theses_order = analysis.theses_order
+        self.theses_levels = analysis.theses_levels
 
-                for relation in thesis_data.supporting_relations:
-                    supporting_thesis_data = self.theses_data[relation.thesis1]
+        # cones are only the same for the same max_depth
+        if analysis.max_depth == self.max_depth:
+            self.apex_cones = analysis.apex_cones
 
-                    if not supporting_thesis_data.taken:
-                        collectable = False
-                        break
+        for thesis, (supporting, supported, level, position) in \
+                analysis.theses.items():
+            thesis_data = self.theses_data[thesis]
 
-                if collectable:
-                    thesis_data.taken = True
-                    self.theses_order.append(thesis)
+            thesis_data.supporting_relations = supporting
+            thesis_data.supported_relations = supported
+            thesis_data.level = level
+            thesis_data.position = position
 
     def _iterate(self):
-        self._calc_all_users_strength()
-        self._calc_relations_strength()
-        self._calc_theses_strength()
-        self._calc_contradictions_strength()
-        self._calc_users_strength()
+        timed = self._timed
+
+        timed('all_users_strength', self._calc_all_users_strength)
+        timed('relations_strength', self._calc_relations_strength)
+        timed('theses_strength', self._calc_theses_strength)
+        timed('contradictions_strength', self._calc_contradictions_strength)
+        timed('users_strength', self._calc_users_strength)
+
+        self.dirty.clear()
+
+    def _timed(self, phase, method):
+        if not self.metrics.enabled:
+            method()
+            return
+
+        start = time.perf_counter()
+        method()
+        self.metrics.timing(phase, time.perf_counter() - start)
+
+    def _count_graph(self):
+        metrics = self.metrics
+
+        if not metrics.enabled:
+            return
+
+        metrics.count('cones', len(self.apex_cones))
+        metrics.count('cone_theses', sum(
+            len(cone.theses) for cone in self.apex_cones.values()))
+        metrics.count('cone_relations', sum(
+            len(cone.relations) for cone in self.apex_cones.values()))
+        metrics.count('contradictions', len(self.contradictions))
 
     def _calc_all_users_strength(self):
+        # any change of a user strength changes the strength of all theses
+        # and relations
+        if not self.moving_users and not self.dirty.everything:
+            return
+
+        self.dirty.everything = True
+
         self.all_users_strength = 0
 
-        for user_data in self.users.values():
+        for user_data in self.user_classes:
             user_data.strength = user_data.next_strength
 
-            self.all_users_strength += user_data.strength
+            self.all_users_strength += user_data.strength * user_data.weight
 
         logger.debug('users strength: %s', self.all_users_strength)
 
     def _calc_relations_strength(self):
-        for relation, relation_data in self.relations.items():
-            relation_data.strength = self._direct_votes_strength(relation)
+        if self.dirty.everything:
+            relations = self.relations
+        else:
+            relations = self.dirty.relations
 
-            logger.debug('relation strength: relation=%s, strength=%s',
-                         relation, relation_data.strength)
+        for relation in relations:
+            relation_data = self.relations[relation]
+            relation_data.strength = self._direct_votes_strength(relation)
 
     def _direct_votes_strength(self, voted_object):
         votes = 0
 
-        for user, vote in voted_object.votes.items():
-            strength = self.users[user].strength
-
-            votes += strength
+        for user_data in self.voted_classes.get(voted_object, ()):
+            votes += user_data.strength * user_data.weight
 
         if votes > 0:
             return votes / self.all_users_strength
         else:
             return 0
 
+    def _calc_thesis_strength(self, thesis):
+        thesis_data = self.theses_data[thesis]
+
+        thesis_data.strength = self._direct_votes_strength(thesis)
+
+        if thesis_data.strength > 0:
+            for relation in thesis_data.supporting_relations:
+                relation_data = self.relations[relation]
+                supporting_thesis_data = self.theses_data[relation.thesis1]
+
+                thesis_data.strength += relation_data.strength * \
+                    supporting_thesis_data.strength
+
     def _calc_theses_strength(self):
-        for thesis in self.theses_order:
+        if self.dirty.everything:
+            for thesis in self.theses_order:
+                self._calc_thesis_strength(thesis)
+
+            self._calc_max_theses_strength()
+
+            return
+
+        # recompute the dirty theses and, following the support DAG in
+        # theses_order, every thesis whose support actually changed
+
+        changed = set()
+        queue = []
+
+        def push(thesis):
+            heapq.heappush(
+                queue, (self.theses_data[thesis].position, thesis))
+
+        for thesis in self.dirty.theses:
+            push(thesis)
+
+        for relation in self.dirty.relations:
+            if relation.type is Relation.SUPPORT:
+                push(relation.thesis2)
+
+        queued = set()
+
+        while queue:
+            position, thesis = heapq.heappop(queue)
+
+            if thesis in queued:
+                continue
+
+            queued.add(thesis)
+
             thesis_data = self.theses_data[thesis]
+            strength = thesis_data.strength
 
-            thesis_data.strength = self._direct_votes_strength(thesis)
+            self._calc_thesis_strength(thesis)
 
-            if thesis_data.strength > 0:
-                for relation in thesis_data.supporting_relations:
-                    relation_data = self.relations[relation]
-                    supporting_thesis_data = self.theses_data[relation.thesis1]
+            if thesis_data.strength == strength:
+                continue
 
-                    thesis_data.strength += relation_data.strength * \
-                        supporting_thesis_data.strength
+            changed.add(thesis)
 
-            logger.debug('thesis strength: thesis=%s, strength=%s',
-                         thesis, thesis_data.strength)
+            for relation in thesis_data.supported_relations:
+                push(relation.thesis2)
 
-        self.max_theses_strength = max(
-            [thesis_data.strength for thesis_data in self.theses_data.values()]
-        )
+        self.dirty.theses = changed
+
+        if not changed:
+            return
+
+        strongest_data = self.theses_data.get(self.strongest_thesis)
+
+        if self.strongest_thesis in changed and \
+                strongest_data.strength < self.max_theses_strength:
+            self._calc_max_theses_strength()
+        else:
+            for thesis in changed:
+                if self.theses_data[thesis].strength > \
+                        self.max_theses_strength:
+                    self.strongest_thesis = thesis
+                    self.max_theses_strength = \
+                        self.theses_data[thesis].strength
+                    # every normalized thesis strength changes
+                    self.dirty.everything = True
 
         logger.debug('max theses strength: %s', self.max_theses_strength)
 
-    def _new_contradiction(self, contradiction_relation, path1, path2):
-        r = Contradiction(contradiction_relation, path1, path2)
+    def _calc_max_theses_strength(self):
+        max_theses_strength = self.max_theses_strength
 
-        self.contradictions.append(r)
+        self.strongest_thesis, thesis_data = max(
+            self.theses_data.items(),
+            key=lambda kv: kv[1].strength
+        )
+        self.max_theses_strength = thesis_data.strength
 
-        return r
+        if self.max_theses_strength != max_theses_strength:
+            self.dirty.everything = True
 
-    def _build_and_assign_contradiction(
-        self, users, relation, path1=None, path2=None
-    ):
-        if not users:
-            return
+        logger.debug('max theses strength: %s', self.max_theses_strength)
 
-        contradiction = self._new_contradiction(relation, path1, path2)
+    def _new_contradiction(self, contradiction_relation, theses1, theses2):
+        r = Contradiction(contradiction_relation, theses1, theses2)
 
-        for user in users:
-            user_data = self.users[user]
+        self.contradictions.append(r)
 
-            user_data.contradictions.setdefault(relation, []).append(
-                contradiction
-            )
+        return r
 
     def _find_users_contradictions(self):
-        # method 3: collect all inconsistencies, starting from contradiciton
-        # relation and following support path, then assign them to voting users
+        # a user voting Ta and Tb is inconsistent if a contradiction relation
+        # T1 -x- T2 holds and Ta -> ... -> T1, T2 <- ... <- Tb (both paths
+        # can be empty).
+        # only the strongest contradiction counts for each user and
+        # contradiction relation: it is found every iteration by dynamic
+        # programming over the support cones of T1 and T2, so here it is
+        # enough to collect the voted theses of both cones. users voting the
+        # same theses share the same contradiction
         self.contradictions = []
+        self.cones = {}
+        # from thesis (support relation) to the contradiction relations whose
+        # cones contain it
+        self.theses_cones = {}
+        self.relations_cones = {}
+        self.contradictions_index = {}
+        # from contradiction relation to its contradictions
+        self.relation_contradictions = {}
 
         for user_data in self.users.values():
             user_data.contradictions = {}
 
-        for relation in filter(lambda r: r.type is Relation.CONTRADICTION,
-                               self.relations):
-            self._build_and_assign_contradiction(
-                relation.thesis1.votes.keys() & relation.thesis2.votes.keys(),
-                relation
-            )
+        contradiction_relations = [
+            r
+            for r in self.relations
+            if r.type is Relation.CONTRADICTION
+        ]
+
+        # with cones from a cached analysis, what is left is cheap, and so
+        # is it with cones bounded by max_depth
+        if self.workers > 1 and not self.apex_cones and \
+                self.max_depth is None and \
+                len(contradiction_relations) >= MIN_PARALLEL_RELATIONS:
+            found = self._discover_contradictions_parallel(
+                contradiction_relations)
+        else:
+            found = map(self._discover_contradictions, contradiction_relations)
 
-            # consider every non repeating path consisting of support relation
-            # ending either in relation.thesis1 or relation.thesis2
-            # such paths are contradictions
-            # i have to take, for each user, just one contradiction for each
-            # relation, the one with max strength
+        for relation, cones, users in found:
+            self.cones[relation] = cones
 
-            all_paths = {}
+            for cone in cones:
+                for thesis in cone.theses:
+                    self.theses_cones.setdefault(thesis, set()).add(relation)
 
-            for ending_point in [relation.thesis1, relation.thesis2]:
-                paths_to_examine = [
-                        Path(supp_rel)
-                        for supp_rel in filter(
-                            lambda r: r.type is Relation.SUPPORT and r.thesis2 is ending_point,
-                            self.problem.relations
-                        )
-                    ]
+                for support_relation in cone.relations:
+                    self.relations_cones.setdefault(
+                        support_relation, set()).add(relation)
 
-                while paths_to_examine:
-                    path = paths_to_examine.pop()
+            for user, theses1, theses2 in users:
+                self._assign_contradiction(user, relation, theses1, theses2)
 
-                    all_paths.setdefault(ending_point, []).append(path)
+    def _discover_contradictions(self, relation):
+        # return (relation, its cones, [(user, theses1, theses2)...])
 
-                    thesis = path.last_thesis
+        cones = (
+            self._support_cone(relation.thesis1),
+            self._support_cone(relation.thesis2),
+        )
 
-                    self._build_and_assign_contradiction(
-                        ending_point.votes.keys() & thesis.votes.keys(),
-                        relation, path
-                    )
+        voted1 = self._voted_theses(cones[0])
+        voted2 = self._voted_theses(cones[1])
 
-                    for supporting_relation in filter(
-                        lambda r: r.type is self.SUPPORT and r.thesis2 is thesis,
-                        thesis.relations
-                    ):
-                        new_thesis = supporting_relation.thesis1
+        return relation, cones, [
+            (user, frozenset(voted1[user]), frozenset(voted2[user]))
+            for user in voted1.keys() & voted2.keys()
+        ]
 
-                        if new_thesis in path:
-                            continue
+    def _support_cone(self, apex):
+        cone = self.apex_cones.get(apex)
 
-                        paths_to_examine.add(path.grow(relation))
+        if cone is None:
+            cone = self.apex_cones[apex] = SupportCone(
+                apex, self.theses_data, self.max_depth)
 
-            for path1 in all_paths.get(relation.thesis1, []):
-                for path2 in all_paths.get(relation.thesis2, []):
-                    thesis1 = path1.last_thesis
-                    thesis2 = path2.last_thesis
+        return cone
 
-                    self._build_and_assign_contradiction(
-                        thesis1.votes.keys() & thesis2.votes.keys(),
-                        relation, path1, path2)
+    def _discover_contradictions_parallel(self, contradiction_relations):
+        # same as _discover_contradictions, on a process pool: theses,
+        # relations and users travel as indexes
 
-    def _normalized_thesis_strength(self, thesis):
-        return self.theses_data[thesis].strength / self.max_theses_strength
+        theses = self.theses_order
+        relations = list(self.relations)
+        users = list(self.users)
 
-    def _calc_contradictions_strength(self):
-        for contradiction in self.contradictions:
-            contradiction_relation = contradiction.contradiction_relation
-            thesis1_strength = self._normalized_thesis_strength(
-                contradiction_relation.thesis1
+        relation_index = {r: i for i, r in enumerate(relations)}
+        user_index = {u: i for i, u in enumerate(users)}
+
+        graph = (
+            [
+                [
+                    (relation_index[r], self.theses_data[r.thesis1].position)
+                    for r in self.theses_data[thesis].supporting_relations
+                ]
+                for thesis in theses
+            ],
+            [self.theses_data[thesis].level for thesis in theses],
+            [[user_index[u] for u in thesis.votes] for thesis in theses],
+        )
+
+        apexes = [
+            (
+                self.theses_data[r.thesis1].position,
+                self.theses_data[r.thesis2].position,
             )
-            thesis2_strength = self._normalized_thesis_strength(
-                contradiction_relation.thesis2
+            for r in contradiction_relations
+        ]
+
+        logger.debug('contradictions discovery: relations=%s, workers=%s',
+                     len(apexes), self.workers)
+
+        results = discover_contradictions(graph, apexes, self.workers)
+
+        for relation, (cones, found) in zip(contradiction_relations, results):
+            for apex, (cone_theses, cone_relations) in zip(
+                (relation.thesis1, relation.thesis2), cones
+            ):
+                if apex not in self.apex_cones:
+                    self.apex_cones[apex] = SupportCone.from_parts(
+                        apex,
+                        {theses[t] for t in cone_theses},
+                        [relations[r] for r in cone_relations]
+                    )
+
+            cones = (
+                self.apex_cones[relation.thesis1],
+                self.apex_cones[relation.thesis2],
             )
 
-            strength = self.relations[contradiction_relation].strength * \
-                thesis1_strength * thesis2_strength
+            yield relation, cones, [
+                (
+                    users[u],
+                    frozenset(theses[t] for t in theses1),
+                    frozenset(theses[t] for t in theses2),
+                )
+                for u, theses1, theses2 in found
+            ]
 
-            for path in [contradiction.path1, contradiction.path2]:
-                if path is None:
-                    continue
+    def _assign_contradiction(self, user, relation, theses1, theses2):
+        key = (relation, theses1, theses2)
 
-                for relation in path.path:
-                    relation_strength = self.relations[relation].strength
-                    thesis1_strength = self._normalized_thesis_strength(
-                        relation.thesis1
-                    )
+        contradiction = self.contradictions_index.get(key)
+
+        if contradiction is None:
+            contradiction = self._new_contradiction(relation, theses1, theses2)
+            self.contradictions_index[key] = contradiction
+            self.relation_contradictions.setdefault(relation, []).append(
+                contradiction)
+
+        user_data = self.users[user]
+        user_contradictions = user_data.contradictions
 
-                    strength *= relation_strength * thesis1_strength
+        previous = user_contradictions.get(relation)
 
-            contradiction.strength = 1 - strength
+        if previous is not None:
+            previous.users.discard(user_data)
+
+        contradiction.users.add(user_data)
+        user_contradictions[relation] = contradiction
+
+    def _update_user_contradiction(self, user, relation):
+        voted = self.problem.voters[user]
+
+        theses1, theses2 = (
+            frozenset(t for t in voted if t in cone.theses)
+            for cone in self.cones[relation]
+        )
+
+        if theses1 and theses2:
+            self._assign_contradiction(user, relation, theses1, theses2)
+        else:
+            user_data = self.users[user]
+            previous = user_data.contradictions.pop(relation, None)
+
+            if previous is not None:
+                previous.users.discard(user_data)
+
+    def _voted_theses(self, cone):
+        voted = {}
+
+        for thesis in cone.theses:
+            for user in thesis.votes:
+                voted.setdefault(user, []).append(thesis)
+
+        return voted
+
+    def _calc_contradictions_strength(self):
+        dirty = self.dirty
+        approximate = self.approximate
+
+        # when approximate, error bounds are kept for every contradiction
+        # relation, even those without contradictions: exact cones could
+        # have some
+        contradiction_relations = self.cones if approximate \
+            else self.relation_contradictions
+
+        if dirty.everything:
+            relations = contradiction_relations
+        else:
+            relations = set()
+
+            for thesis in dirty.theses:
+                relations.update(self.theses_cones.get(thesis, ()))
+
+            for relation in dirty.relations:
+                relations.update(self.relations_cones.get(relation, ()))
+
+                if relation in contradiction_relations:
+                    relations.add(relation)
+
+        # within an iteration, each thesis is normalized once and the best
+        # products of a cone are computed once, however many contradiction
+        # relations share its apex
+
+        normalized = {}
+        products = {}
+
+        def normalized_strength(thesis):
+            strength = normalized.get(thesis)
+
+            if strength is None:
+                # no thesis has strength when no user has: as in
+                # numpy_solver, they all count 0
+                strength = normalized[thesis] = \
+                    self.theses_data[thesis].strength / \
+                    self.max_theses_strength if self.max_theses_strength \
+                    else 0
+
+            return strength
+
+        def support_strength(relation):
+            return self.relations[relation].strength * \
+                normalized_strength(relation.thesis1)
+
+        def best_products(cone):
+            best = products.get(cone.apex)
+
+            if best is None:
+                best = products[cone.apex] = cone.best_products(
+                    support_strength, self.epsilon)
+
+            return best
+
+        for contradiction_relation in relations:
+            contradictions = [
+                c
+                for c in self.relation_contradictions.get(
+                    contradiction_relation, ())
+                if c.users
+            ]
+
+            if not contradictions and not approximate:
+                continue
+
+            cones = self.cones[contradiction_relation]
+            best1, best2 = map(best_products, cones)
+
+            base_strength = self.relations[contradiction_relation].strength * \
+                normalized_strength(contradiction_relation.thesis1) * \
+                normalized_strength(contradiction_relation.thesis2)
+
+            if approximate:
+                # 1 - base * p1 * p2, with p1 and p2 at most 1, moves by at
+                # most base * (error of p1 + error of p2)
+                self.contradiction_errors[contradiction_relation] = \
+                    base_strength * (
+                        cones[0].error_bound(best1, self.epsilon) +
+                        cones[1].error_bound(best2, self.epsilon))
+
+            # with epsilon, voted theses can be left out of best products
+            for contradiction in contradictions:
+                strength = 1 - base_strength * \
+                    max(best1.get(t, 0) for t in contradiction.theses1) * \
+                    max(best2.get(t, 0) for t in contradiction.theses2)
+
+                if strength != contradiction.strength:
+                    contradiction.strength = strength
+                    dirty.contradictions.add(contradiction)
+
+    def _error_bound(self):
+        # a user strength is a product of at most one contradiction
+        # strength per contradiction relation, all in [0, 1]: errors add up
+        return min(1, sum(self.contradiction_errors.values()))
 
     def _calc_users_strength(self):
-        for user, user_data in self.users.items():
+        dirty = self.dirty
+
+        if dirty.everything:
+            users = self.user_classes
+        else:
+            users = set(dirty.users)
+
+            for contradiction in dirty.contradictions:
+                users.update(contradiction.users)
+
+        self.moving_users = set()
+
+        for user_data in users:
             strength = 1
 
-            for relation, contradictions in user_data.contradictions.items():
-                strength *= max(map(lambda x: x.strength, contradictions))
+            for contradiction in user_data.contradictions.values():
+                strength *= contradiction.strength
 
             user_data.next_strength = strength
 
-            logger.debug('strength: user=%s, strength=%s',
-                         user, user_data.next_strength)
+            if strength != user_data.strength:
+                self.moving_users.add(user_data)
 
-    def _converged(self):
-        for user_data in self.users.values():
-            error = (user_data.next_strength - user_data.strength) ** 2
+    def _snapshot(self, residual):
+        return Snapshot(
+            self.iteration,
+            residual,
+            {u: d.next_strength for u, d in self.users.items()},
+            {t: d.strength for t, d in self.theses_data.items()},
+            {r: d.strength for r, d in self.relations.items()},
+        )
+
+    def _residual(self):
+        # users not moving have no error
+        return max(
+            (
+                (user_data.next_strength - user_data.strength) ** 2
+                for user_data in self.moving_users
+            ),
+            default=0
+        )
+
+    def _accelerate(self):
+        if type(self.convergence) is FixedPoint:
+            return
 
-            if error > self.error_threshold:
-                return False
+        # one entry per user, not per class, as strategies mixing past
+        # iterates weigh every entry the same
+        users = list(self.users.values())
 
-        return True
+        strengths = self.convergence.accelerate(
+            [user_data.strength for user_data in users],
+            [user_data.next_strength for user_data in users]
+        )
+
+        self.moving_users = set()
+
+        for user_data, strength in zip(users, strengths):
+            user_data.next_strength = strength
+
+            if strength != user_data.strength:
+                self.moving_users.add(user_data)
+
+    def _ranking(self, k):
+        # the k strongest solutions, as (thesis, strength), ties broken as
+        # in _find_strongest_solution
+        return [
+            (thesis, thesis_data.strength)
+            for thesis, thesis_data in heapq.nsmallest(
+                k,
+                filter(lambda kv: kv[0].is_solution, self.theses_data.items()),
+                key=lambda kv: (-kv[1].strength, kv[0].content)
+            )
+        ]
 
     def _find_strongest_solution(self):
-        return max(
+        # ties go to the solution with the smallest content, so that the
+        # result does not depend on set ordering
+        return min(
             filter(lambda kv: kv[0].is_solution, self.theses_data.items()),
-            key=lambda kv: kv[1].strength,
+            key=lambda kv: (-kv[1].strength, kv[0].content),
             default=(None, None)
             )[0]
@@ -0,0 +1,234 @@
+"""
+Binary snapshots of a problem and, optionally, of solver strengths.
+
+A snapshot is a magic string, the length of a JSON header and the header
+itself, followed by 8 bytes aligned little endian arrays, whose dtype,
+offset and length are in the header:
+
+    thesis_solution         uint8, one per thesis
+    thesis_content_offsets  int64, theses + 1 offsets in thesis_contents
+    thesis_contents         uint8, UTF-8 contents, concatenated
+    relation_type           uint8, 0 support, 1 contradiction
+    relation_thesis1        int64, thesis index
+    relation_thesis2        int64, thesis index
+    user_name_offsets       int64, users + 1 offsets in user_names
+    user_names              uint8, UTF-8 names, concatenated
+    vote_object             int64, theses first, then relations
+    vote_user               int64
+    vote_sign               int8
+
+and, when written with a solver, float64 user_strength,
+user_next_strength, thesis_strength and relation_strength.
+
+Snapshot opens the file with mmap and exposes arrays, by name, as read
+only numpy views of it, without copying.
+"""
+
+import json
+import mmap
+import struct
+
+import numpy
+
+from . import serialization
+from .model import Relation
+
+
+MAGIC = b'DRSNAP01'
+HEADER_SIZE = struct.Struct('<Q')
+ALIGNMENT = 8
+
+
+def _strings(values):
+    encoded = [v.encode('utf-8') for v in values]
+
+    offsets = numpy.zeros(len(encoded) + 1, dtype='<i8')
+    numpy.cumsum([len(e) for e in encoded], out=offsets[1:])
+
+    return offsets, numpy.frombuffer(b''.join(encoded), dtype=numpy.uint8)
+
+
+def write(path, problem, solver=None):
+    """
+    Write a snapshot of problem and, if given, of the strengths of solver,
+    a solver of problem.
+    """
+
+    data, theses = serialization.encode(problem)
+
+    question, theses_data, relations_data, names, vote_objects, \
+        vote_users, vote_signs = data
+
+    thesis_content_offsets, thesis_contents = _strings(
+        content for content, _ in theses_data)
+    user_name_offsets, user_names = _strings(names)
+
+    arrays = {
+        'thesis_solution': numpy.array(
+            [is_solution for _, is_solution in theses_data],
+            dtype=numpy.uint8),
+        'thesis_content_offsets': thesis_content_offsets,
+        'thesis_contents': thesis_contents,
+        'relation_type': numpy.array(
+            [code for code, _, _ in relations_data], dtype=numpy.uint8),
+        'relation_thesis1': numpy.array(
+            [i1 for _, i1, _ in relations_data], dtype='<i8'),
+        'relation_thesis2': numpy.array(
+            [i2 for _, _, i2 in relations_data], dtype='<i8'),
+        'user_name_offsets': user_name_offsets,
+        'user_names': user_names,
+        'vote_object': numpy.array(vote_objects, dtype='<i8'),
+        'vote_user': numpy.array(vote_users, dtype='<i8'),
+        'vote_sign': numpy.array(vote_signs, dtype=numpy.int8),
+    }
+
+    if solver is not None:
+        users = {u.name: d for u, d in solver.users.items()}
+        relations = {
+            (r.type, r.thesis1, r.thesis2): d
+            for r, d in solver.relations.items()
+        }
+
+        users = [users[name] for name in names]
+        relations = [
+            relations[(
+                Relation.SUPPORT
+                if code == serialization.SUPPORT
+                else Relation.CONTRADICTION,
+                theses[i1], theses[i2]
+            )]
+            for code, i1, i2 in relations_data
+        ]
+
+        arrays['user_strength'] = numpy.array(
+            [d.strength for d in users], dtype='<f8')
+        arrays['user_next_strength'] = numpy.array(
+            [d.next_strength for d in users], dtype='<f8')
+        arrays['thesis_strength'] = numpy.array(
+            [solver.theses_data[t].strength for t in theses], dtype='<f8')
+        arrays['relation_strength'] = numpy.array(
+            [d.strength for d in relations], dtype='<f8')
+
+    specs = {}
+    offset = 0
+
+    for name, array in arrays.items():
+        specs[name] = (array.dtype.str, offset, len(array))
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header = json.dumps({
+        'question': question,
+        'arrays': specs,
+    }).encode('utf-8')
+
+    start = len(MAGIC) + HEADER_SIZE.size + len(header)
+    padding = -start % ALIGNMENT
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER_SIZE.pack(len(header) + padding))
+        f.write(header)
+        f.write(b' ' * padding)
+
+        for array in arrays.values():
+            f.write(array.tobytes())
+            f.write(b'\0' * (-array.nbytes % ALIGNMENT))
+
+
+class Snapshot:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = self._mmap
+
+        assert buffer[:len(MAGIC)] == MAGIC, 'not a snapshot'
+
+        header_start = len(MAGIC) + HEADER_SIZE.size
+        header_size, = HEADER_SIZE.unpack_from(buffer, len(MAGIC))
+
+        header = json.loads(
+            bytes(buffer[header_start:header_start + header_size]))
+
+        self.question = header['question']
+
+        start = header_start + header_size
+
+        self.arrays = {
+            name: numpy.frombuffer(
+                buffer, dtype=dtype, count=length, offset=start + offset)
+            for name, (dtype, offset, length) in header['arrays'].items()
+        }
+
+    def close(self):
+        # fails with BufferError while views of arrays are still referenced
+        self.arrays = {}
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def has_strengths(self):
+        return 'user_strength' in self.arrays
+
+    def thesis_contents(self):
+        return _decode_strings(
+            self.arrays['thesis_content_offsets'],
+            self.arrays['thesis_contents'])
+
+    def user_names(self):
+        return _decode_strings(
+            self.arrays['user_name_offsets'], self.arrays['user_names'])
+
+    def problem(self):
+        """
+        Return (problem, theses), a new dr.model.Problem with the theses
+        in snapshot order.
+        """
+
+        return serialization.decode((
+            self.question,
+            list(zip(
+                self.thesis_contents(),
+                map(bool, self.arrays['thesis_solution'].tolist()))),
+            list(zip(
+                self.arrays['relation_type'].tolist(),
+                self.arrays['relation_thesis1'].tolist(),
+                self.arrays['relation_thesis2'].tolist())),
+            self.user_names(),
+            self.arrays['vote_object'].tolist(),
+            self.arrays['vote_user'].tolist(),
+            self.arrays['vote_sign'].tolist(),
+        ))
+
+    def warm_start(self, solver):
+        """
+        Start the next solve of solver, a solver of the snapshot problem,
+        from the snapshot user strengths.
+        """
+
+        assert self.has_strengths, 'snapshot without strengths'
+
+        users = {u.name: u for u in solver.users}
+
+        solver.warm_start({
+            users[name]: strength
+            for name, strength in zip(
+                self.user_names(),
+                self.arrays['user_next_strength'].tolist())
+            if name in users
+        })
+
+
+def _decode_strings(offsets, blob):
+    data = blob.tobytes()
+    offsets = offsets.tolist()
+
+    return [
+        data[start:end].decode('utf-8')
+        for start, end in zip(offsets, offsets[1:])
+    ]
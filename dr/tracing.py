@@ -0,0 +1,49 @@
+"""
+Tracing of Solver iterations.
+
+A Tracer passed to Solver gets, after every iteration, a snapshot of the
+strengths of all users (the strength for the next iteration), theses and
+relations, and keeps the last capacity of them in a ring buffer. Without
+a tracer, solvers do not even build snapshots.
+"""
+
+import collections
+
+
+class Snapshot:
+    def __init__(self, iteration, residual, users, theses, relations):
+        self.iteration = iteration
+        self.residual = residual
+        # from user (thesis, relation) to strength
+        self.users = users
+        self.theses = theses
+        self.relations = relations
+
+
+class Tracer:
+    def __init__(self, capacity=100):
+        assert capacity > 0, 'illegal capacity'
+
+        self.snapshots = collections.deque(maxlen=capacity)
+
+    def record(self, snapshot):
+        self.snapshots.append(snapshot)
+
+    def clear(self):
+        self.snapshots.clear()
+
+    def residuals(self):
+        return [(s.iteration, s.residual) for s in self.snapshots]
+
+    def history(self, item):
+        """
+        Return the (iteration, strength) pairs of item, a user, thesis or
+        relation, still in the buffer.
+        """
+
+        return [
+            (s.iteration, strengths[item])
+            for s in self.snapshots
+            for strengths in (s.users, s.theses, s.relations)
+            if item in strengths
+        ]
@@ -0,0 +1,164 @@
+from array import array
+
+import numpy
+
+
+class VoteStore:
+    """
+    Columnar log of votes: three parallel arrays of user id, voted object
+    id and sign (+1/-1). Ids are dense and assigned by the store, users
+    and voted objects (theses and relations) are in users and objects.
+
+    The log is append only: when a user votes the same object again, the
+    last vote wins in every view.
+    """
+
+    def __init__(self):
+        self.users = []
+        self.user_ids = {}
+        self.objects = []
+        self.object_ids = {}
+
+        self.user_column = array('q')
+        self.object_column = array('q')
+        self.sign_column = array('b')
+
+        self._resolved = None
+
+    def __len__(self):
+        return len(self.user_column)
+
+    def user_id(self, user):
+        user_id = self.user_ids.get(user)
+
+        if user_id is None:
+            user_id = self.user_ids[user] = len(self.users)
+            self.users.append(user)
+
+        return user_id
+
+    def object_id(self, voted):
+        object_id = self.object_ids.get(voted)
+
+        if object_id is None:
+            object_id = self.object_ids[voted] = len(self.objects)
+            self.objects.append(voted)
+
+        return object_id
+
+    def append(self, user, voted, sign):
+        self.user_column.append(self.user_id(user))
+        self.object_column.append(self.object_id(voted))
+        self.sign_column.append(sign)
+
+        self._resolved = None
+
+    def extend(self, votes):
+        """
+        Bulk append an iterable of (user, voted object, sign).
+        """
+
+        user_id = self.user_id
+        object_id = self.object_id
+
+        for user, voted, sign in votes:
+            self.user_column.append(user_id(user))
+            self.object_column.append(object_id(voted))
+            self.sign_column.append(sign)
+
+        self._resolved = None
+
+    def extend_ids(self, user_ids, object_ids, signs):
+        """
+        Bulk append parallel sequences of ids, already known to the store,
+        and signs.
+        """
+
+        assert len(user_ids) == len(object_ids) == len(signs), \
+            'columns of different length'
+
+        self.user_column.extend(user_ids)
+        self.object_column.extend(object_ids)
+        self.sign_column.extend(signs)
+
+        self._resolved = None
+
+    def columns(self):
+        """
+        Return (user ids, object ids, signs) arrays of the current votes,
+        sorted by object id and then user id.
+        """
+
+        return self._resolve()[:3]
+
+    def object_votes(self, voted):
+        """
+        Return (user ids, signs) arrays of the current votes of voted.
+        """
+
+        users, objects, signs, object_offsets, _, _ = self._resolve()
+
+        object_id = self.object_ids.get(voted)
+
+        if object_id is None:
+            return users[:0], signs[:0]
+
+        start, end = object_offsets[object_id:object_id + 2]
+
+        return users[start:end], signs[start:end]
+
+    def user_votes(self, user):
+        """
+        Return (object ids, signs) arrays of the current votes of user.
+        """
+
+        users, objects, signs, _, by_user, user_offsets = self._resolve()
+
+        user_id = self.user_ids.get(user)
+
+        if user_id is None:
+            return objects[:0], signs[:0]
+
+        rows = by_user[user_offsets[user_id]:user_offsets[user_id + 1]]
+
+        return objects[rows], signs[rows]
+
+    def _resolve(self):
+        if self._resolved is not None:
+            return self._resolved
+
+        users = numpy.array(self.user_column, dtype=numpy.intp)
+        objects = numpy.array(self.object_column, dtype=numpy.intp)
+        signs = numpy.array(self.sign_column, dtype=numpy.int8)
+
+        # lexsort is stable: within a (object, user) group rows keep their
+        # order, and the last one is the vote that counts
+        order = numpy.lexsort((users, objects))
+
+        users = users[order]
+        objects = objects[order]
+        signs = signs[order]
+
+        last = numpy.ones(len(order), dtype=bool)
+        last[:-1] = (objects[1:] != objects[:-1]) | (users[1:] != users[:-1])
+
+        users = users[last]
+        objects = objects[last]
+        signs = signs[last]
+
+        object_offsets = numpy.zeros(len(self.objects) + 1, dtype=numpy.intp)
+        numpy.cumsum(
+            numpy.bincount(objects, minlength=len(self.objects)),
+            out=object_offsets[1:])
+
+        by_user = numpy.argsort(users, kind='stable')
+
+        user_offsets = numpy.zeros(len(self.users) + 1, dtype=numpy.intp)
+        numpy.cumsum(
+            numpy.bincount(users, minlength=len(self.users)),
+            out=user_offsets[1:])
+
+        self._resolved = (
+            users, objects, signs, object_offsets, by_user, user_offsets)
+
+        return self._resolved
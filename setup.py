@@ -18,6 +18,10 @@ SCRIPTS = [
 ]
 TEST_SUITE = "tests"
 INSTALL_REQUIRES = open("requirements.txt").readlines()
+EXTRAS_REQUIRE = {
+    # dr.numpy_solver
+    "numpy": ["numpy"],
+}
 CLASSIFIERS = [
     "Development Status :: 1 - Planning",
     "Intended Audience :: Developers",
@@ -121,10 +125,11 @@ setup(
     url=PACKAGE_URL,
     zip_safe=False,  # unnecessary; it avoids egg-as-zipfile install
     # gentoo setuptools fails to build if namespaces packages does not contain __init__.py...
-    packages=find_packages(exclude=['tests']),  # + namespace_packages()),
+    packages=find_packages(exclude=['tests', 'benchmarks']),  # + namespace_packages()),
     namespace_packages=namespace_packages(),
     setup_requires=setup_requires,
     install_requires=INSTALL_REQUIRES,
+    extras_require=EXTRAS_REQUIRE,
     scripts=SCRIPTS,
     tests_require=tests_require,
     cmdclass=other_commands,
@@ -0,0 +1,77 @@
+"""
+Problems shared by the tests.
+"""
+
+from dr import model
+
+
+def debate(m=model):
+    """
+    t3 -> t1 -x- t2
+
+    u1 votes t2, t3 and t3 -> t1, u2 votes t1 and t1 -x- t2: t1 wins.
+    m is the model module, dr.model or dr.compact_model.
+    """
+
+    u1 = m.User('u1')
+    u2 = m.User('u2')
+
+    t1 = m.Thesis('t1', True)
+    t2 = m.Thesis('t2', True)
+    t3 = m.Thesis('t3', False)
+
+    p = m.Problem('p')
+
+    for t in [t1, t2, t3]:
+        p.add_thesis(t)
+
+    r31 = m.Relation(m.Relation.SUPPORT, t3, t1)
+    c12 = m.Relation(m.Relation.CONTRADICTION, t1, t2)
+
+    p.add_relation(r31)
+    p.add_relation(c12)
+
+    t1.upvote(u2)
+    t2.upvote(u1)
+    t3.upvote(u1)
+    r31.upvote(u1)
+    c12.upvote(u2)
+
+    return p
+
+
+def thesis(problem, content):
+    return next(t for t in problem.theses if t.content == content)
+
+
+def random_problem(rnd, users=5, theses=8, relations=12, question='p',
+                   support_rate=.5, downvote_rate=0):
+    """
+    A problem with random relations among theses, the first 3 being
+    solutions, each thesis and relation voted by 1 to 3 random users.
+    """
+
+    users = [model.User('u%s' % i) for i in range(users)]
+    theses = [model.Thesis('t%s' % i, i < 3) for i in range(theses)]
+
+    p = model.Problem(question)
+
+    for t in theses:
+        p.add_thesis(t)
+
+    for _ in range(relations):
+        t1, t2 = rnd.sample(theses, 2)
+
+        p.add_relation(model.Relation(
+            model.Relation.SUPPORT if rnd.random() < support_rate
+            else model.Relation.CONTRADICTION,
+            t1, t2))
+
+    for voted in sorted(p.theses, key=str) + sorted(p.relations, key=str):
+        for u in rnd.sample(users, rnd.randint(1, 3)):
+            if rnd.random() < downvote_rate:
+                voted.downvote(u)
+            else:
+                voted.upvote(u)
+
+    return p
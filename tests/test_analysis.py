@@ -0,0 +1,88 @@
+import random
+from unittest import TestCase, skipUnless
+
+from dr.model import Thesis, Relation, User, Problem
+from dr.analysis import AnalysisCache
+from dr import simple_solver
+
+try:
+    from dr import numpy_solver
+except ImportError:  # numpy is an optional extra
+    numpy_solver = None
+
+
+class TestAnalysis (TestCase):
+    def test_cache(self):
+        self.check_cache(simple_solver)
+
+    @skipUnless(numpy_solver, 'numpy is not installed')
+    def test_cache_numpy(self):
+        self.check_cache(numpy_solver)
+
+    def check_cache(self, module):
+        rnd = random.Random(8)
+
+        users = [User('u%s' % i) for i in range(5)]
+        theses = [Thesis('t%s' % i, i < 3) for i in range(10)]
+
+        p = Problem('p')
+
+        for t in theses:
+            p.add_thesis(t)
+
+        while len(p.relations) < 16:
+            t1, t2 = rnd.sample(theses, 2)
+
+            p.add_relation(Relation(
+                rnd.choice([Relation.SUPPORT, Relation.CONTRADICTION]),
+                t1, t2))
+
+        voted = sorted(p.theses, key=str) + sorted(p.relations, key=str)
+
+        for v in voted:
+            for u in rnd.sample(users, 2):
+                v.upvote(u)
+
+        cache = AnalysisCache()
+
+        first = module.Solver(p, max_iterations=50, analysis_cache=cache)
+        first.solve()
+
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        # votes do not invalidate the analysis
+
+        rnd.choice(voted).downvote(rnd.choice(users))
+        rnd.choice(voted).upvote(User('new'))
+
+        cached = module.Solver(p, max_iterations=50, analysis_cache=cache)
+        expected = module.Solver(p, max_iterations=50)
+
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertIs(cached.apex_cones, first.apex_cones)
+        self.assertEqual(cached.theses_order, expected.theses_order)
+
+        self.assertEqual(cached.solve(), expected.solve())
+
+        for thesis, thesis_data in expected.theses_data.items():
+            self.assertAlmostEqual(
+                cached.theses_data[thesis].strength, thesis_data.strength)
+
+        # theses and relations do
+
+        t = Thesis('t%s' % len(p.theses), False)
+
+        p.add_thesis(t)
+        p.add_relation(Relation(Relation.SUPPORT, t, theses[0]))
+
+        latest = module.Solver(p, max_iterations=50, analysis_cache=cache)
+
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+        # cones depend on max_depth
+
+        bounded = module.Solver(
+            p, max_iterations=50, analysis_cache=cache, max_depth=1)
+
+        self.assertEqual(bounded.theses_order, latest.theses_order)
+        self.assertIsNot(bounded.apex_cones, latest.apex_cones)
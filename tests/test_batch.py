@@ -0,0 +1,33 @@
+import random
+from unittest import TestCase
+
+from dr.batch import solve_many
+from dr.simple_solver import Solver
+
+from .fixtures import random_problem
+
+
+class TestBatch (TestCase):
+    def test_solve_many(self):
+        rnd = random.Random(5)
+
+        problems = [
+            random_problem(
+                rnd, users=4, theses=6, relations=8, question='p%s' % n)
+            for n in range(40)
+        ]
+
+        expected = [Solver(p, max_iterations=50).solve() for p in problems]
+
+        for workers in [1, 2]:
+            actual = solve_many(
+                problems, workers=workers, chunksize=3, max_iterations=50)
+
+            self.assertEqual(actual, expected)
+
+            for solution, p in zip(actual, problems):
+                # solutions are theses of the input problems
+                self.assertTrue(any(solution is t for t in p.theses))
+
+    def test_solve_many_empty(self):
+        self.assertEqual(solve_many([], workers=2), [])
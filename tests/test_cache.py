@@ -0,0 +1,59 @@
+import shutil
+import tempfile
+from unittest import TestCase
+
+from dr.model import User
+from dr.cache import ResultCache
+from dr.simple_solver import Solver
+
+from .fixtures import debate, thesis
+
+
+class TestCache (TestCase):
+    def test_memory(self):
+        cache = ResultCache(capacity=1)
+
+        p = debate()
+
+        result = cache.solve(p)
+
+        self.assertEqual(result.winner_thesis(p), Solver(p).solve())
+        self.assertEqual(set(result.theses), {'t1', 't2', 't3'})
+        self.assertEqual(set(result.users), {'u1', 'u2'})
+        self.assertIn(('support', 't3', 't1'), result.relations)
+
+        # an equal problem hits
+        self.assertIs(cache.solve(debate()), result)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # another solver does not
+        class OtherSolver (Solver):
+            pass
+
+        cache.solve(p, solver=OtherSolver)
+        self.assertEqual(cache.misses, 2)
+
+        # which evicted the first result
+        cache.solve(p)
+        self.assertEqual(cache.misses, 3)
+
+        # votes change fingerprints
+        thesis(p, 't2').upvote(User('u3'))
+
+        self.assertIsNot(cache.solve(p), result)
+        self.assertEqual(cache.misses, 4)
+
+    def test_disk(self):
+        directory = tempfile.mkdtemp()
+
+        try:
+            result = ResultCache(directory=directory).solve(debate())
+
+            cache = ResultCache(directory=directory)
+            cached = cache.solve(debate())
+
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
+            self.assertEqual(cached.winner, result.winner)
+            self.assertEqual(cached.theses, result.theses)
+        finally:
+            shutil.rmtree(directory)
@@ -0,0 +1,99 @@
+from unittest import TestCase
+
+from dr import compact_model, model
+from dr.compact_model import Thesis, Relation, User, Problem
+from dr.simple_solver import Solver
+
+from .fixtures import debate
+
+
+class TestCompactModel (TestCase):
+    def test_slots(self):
+        t = Thesis('t', True)
+
+        self.assertFalse(hasattr(t, '__dict__'))
+        self.assertFalse(hasattr(User('x'), '__dict__'))
+        self.assertFalse(hasattr(
+            Relation(Relation.SUPPORT, t, Thesis('u', True)), '__dict__'))
+
+    def test_user(self):
+        u = User('x')
+
+        self.assertEqual(u, User('x'))
+        self.assertNotEqual(u, User('y'))
+        self.assertEqual(hash(u), hash(User('x')))
+
+    def test_ids(self):
+        p = Problem('q')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', False)
+
+        p.add_thesis(t1)
+        p.add_thesis(t2)
+
+        self.assertEqual((t1.id, t2.id), (0, 1))
+
+        # same content, same id
+        t1bis = Thesis('t1', False)
+        p.add_thesis(t1bis)
+
+        self.assertEqual(t1bis.id, 0)
+        self.assertEqual(t1bis, t1)
+        self.assertEqual(len(p.theses), 2)
+
+        r12 = Relation(Relation.SUPPORT, t1, t2)
+        r21 = Relation(Relation.SUPPORT, t2, t1)
+
+        p.add_relation(r12)
+        p.add_relation(r21)
+
+        self.assertNotEqual(r12, r21)
+        self.assertNotEqual(hash(r12), hash(r21))
+        self.assertEqual(len(p.relations), 2)
+
+        # equal ids of different problems are different objects
+        other = Problem('other')
+        t3 = Thesis('t3', True)
+        other.add_thesis(t3)
+
+        self.assertEqual(t3.id, t1.id)
+        self.assertNotEqual(t3, t1)
+
+        try:
+            p.add_relation(Relation(Relation.SUPPORT, t1, t3))
+            self.fail('Should raise AssertionError')
+        except AssertionError:
+            pass
+
+    def test_votes(self):
+        p = Problem('q')
+
+        t1 = Thesis('t1', True)
+        u1 = User('u1')
+
+        t1.upvote(u1)
+        p.add_thesis(t1)
+        t1.downvote(User('u2'))
+
+        self.assertEqual(p.voters, {u1: {t1}, User('u2'): {t1}})
+
+        # users are interned by each problem on their first vote
+        t2 = Thesis('t2', False)
+        p.add_thesis(t2)
+        t2.upvote(User('u1'))
+
+        other = Problem('other')
+        t3 = Thesis('t3', True)
+        other.add_thesis(t3)
+        t3.upvote(User('u2'))
+
+        self.assertEqual(p.user_ids, {'u1': 0, 'u2': 1})
+        self.assertEqual(other.user_ids, {'u2': 0})
+
+    def test_solver(self):
+        compact = Solver(debate(compact_model))
+        plain = Solver(debate(model))
+
+        self.assertEqual(compact.solve().content, plain.solve().content)
+        self.assertEqual(compact.iteration, plain.iteration)
@@ -0,0 +1,58 @@
+import random
+from unittest import TestCase, skipUnless
+
+from dr.convergence import Aitken, Anderson, Damping, FixedPoint
+from dr import simple_solver
+
+try:
+    from dr import numpy_solver
+except ImportError:  # numpy is an optional extra
+    numpy_solver = None
+
+from .fixtures import random_problem
+
+
+class TestConvergence (TestCase):
+    def test_linear_map(self):
+        # g(x) = x / 2 + .25 has fixed point .5
+
+        def g(x):
+            return [v / 2 + .25 for v in x]
+
+        for strategy in [FixedPoint(), Damping(), Aitken(), Anderson()]:
+            x = [1, 0]
+
+            for _ in range(100):
+                x = strategy.accelerate(x, g(x))
+
+            for v in x:
+                self.assertAlmostEqual(v, .5)
+
+        # extrapolation solves a linear map in one step
+        strategy = Aitken()
+        strategy.accelerate([1], [.75])
+
+        self.assertAlmostEqual(strategy.accelerate([.75], [.625])[0], .5)
+
+    def test_strategies_random(self):
+        self.check_strategies_random(simple_solver)
+
+    @skipUnless(numpy_solver, 'numpy is not installed')
+    def test_strategies_random_numpy(self):
+        self.check_strategies_random(numpy_solver)
+
+    def check_strategies_random(self, module):
+        rnd = random.Random(7)
+
+        for _ in range(30):
+            p = random_problem(rnd)
+
+            for strategy in [Damping, Aitken, Anderson]:
+                solver = module.Solver(
+                    p, max_iterations=100, convergence=strategy())
+                solver.solve()
+
+                self.assertTrue(solver.report.converged)
+
+                for user_data in solver.users.values():
+                    self.assertTrue(0 <= user_data.strength <= 1)
@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+from dr.graph import (
+    GraphCycleError, reachable, strongly_connected_components,
+    topological_levels
+)
+
+
+class TestGraph (TestCase):
+    def test_strongly_connected_components(self):
+        graph = {
+            1: [2],
+            2: [3],
+            3: [1, 4],
+            4: [5],
+            5: [4],
+            6: [6],
+            7: [],
+        }
+
+        components = strongly_connected_components(
+            graph, lambda n: graph[n])
+
+        self.assertEqual(
+            sorted(sorted(c) for c in components),
+            [[1, 2, 3], [4, 5], [6], [7]]
+        )
+
+    def test_strongly_connected_components_long_chain(self):
+        # deep enough to overflow a recursive implementation
+
+        n = 100000
+
+        components = list(strongly_connected_components(
+            range(n), lambda i: [i + 1] if i + 1 < n else [0]))
+
+        self.assertEqual(len(components), 1)
+        self.assertEqual(len(components[0]), n)
+
+    def test_reachable(self):
+        graph = {1: [2], 2: [3], 3: [], 4: [1]}
+
+        self.assertEqual(reachable([2], lambda n: graph[n]), {2, 3})
+        self.assertEqual(reachable([], lambda n: graph[n]), set())
+
+    def test_topological_levels(self):
+        predecessors = {1: [], 2: [1], 3: [1, 2], 4: [], 5: [4, 3]}
+
+        levels = topological_levels(predecessors, lambda n: predecessors[n])
+
+        self.assertEqual(
+            [sorted(level) for level in levels],
+            [[1, 4], [2], [3], [5]]
+        )
+
+    def test_topological_levels_cycle(self):
+        predecessors = {1: [], 2: [1, 3], 3: [2], 4: [3]}
+
+        with self.assertRaises(GraphCycleError):
+            topological_levels(predecessors, lambda n: predecessors[n])
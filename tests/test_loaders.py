@@ -0,0 +1,119 @@
+import io
+from unittest import TestCase, skipUnless
+
+from dr.model import Relation, Problem
+from dr import loaders
+from dr.simple_solver import Solver
+
+try:
+    import numpy
+except ImportError:  # numpy is an optional extra
+    numpy = None
+
+
+JSONL = '\n'.join([
+    '{"type": "thesis", "content": "t1", "solution": true}',
+    '{"type": "thesis", "content": "t2", "solution": true}',
+    '{"type": "thesis", "content": "t3", "solution": false}',
+    '{"type": "relation", "relation": "support", '
+    '"thesis1": "t3", "thesis2": "t1"}',
+    '{"type": "relation", "relation": "contradiction", '
+    '"thesis1": "t1", "thesis2": "t2"}',
+    '{"type": "vote", "user": "u2", "vote": 1, "thesis": "t1"}',
+    '{"type": "vote", "user": "u1", "vote": 1, "thesis": "t2"}',
+    '{"type": "vote", "user": "u1", "vote": 1, "thesis": "t3"}',
+    '{"type": "vote", "user": "u2", "vote": -1, "thesis": "t3"}',
+    '{"type": "vote", "user": "u1", "vote": 1, "relation": "support", '
+    '"thesis1": "t3", "thesis2": "t1"}',
+    '{"type": "vote", "user": "u2", "vote": 1, "relation": "contradiction", '
+    '"thesis1": "t1", "thesis2": "t2"}',
+])
+
+CSV = '''thesis,t1,true
+thesis,t2,true
+thesis,t3,false
+relation,support,t3,t1
+relation,contradiction,t1,t2
+vote,u2,1,t1
+vote,u1,1,t2
+vote,u1,1,t3
+vote,u2,-1,t3
+vote,u1,1,support,t3,t1
+vote,u2,1,contradiction,t1,t2
+'''
+
+
+class TestLoaders (TestCase):
+    def assertSameProblem(self, p1, p2):
+        self.assertEqual(p1.theses, p2.theses)
+        self.assertEqual(p1.relations, p2.relations)
+
+        for voted in p1.theses | p1.relations:
+            other = next(v for v in p2.theses | p2.relations if v == voted)
+
+            self.assertEqual(voted.votes, other.votes)
+
+    def test_load(self):
+        p1 = loaders.load(loaders.read_jsonl(io.StringIO(JSONL)), Problem('p'))
+        p2 = loaders.load(loaders.read_csv(io.StringIO(CSV)), Problem('p'))
+
+        self.assertEqual(len(p1.theses), 3)
+        self.assertEqual(len(p1.relations), 2)
+        self.assertEqual(len(p1.voters), 2)
+
+        self.assertSameProblem(p1, p2)
+
+        t3 = next(t for t in p1.theses if t.content == 't3')
+
+        self.assertEqual(
+            {u.name: v for u, v in t3.votes.items()}, {'u1': 1, 'u2': -1})
+        self.assertEqual(len(p1.supported_relations[t3]), 1)
+        self.assertIs(
+            p1.supported_relations[t3][0].type, Relation.SUPPORT)
+
+        self.assertEqual(Solver(p1).solve(), Solver(p2).solve())
+
+    @skipUnless(numpy, 'numpy is not installed')
+    def test_load_vote_store(self):
+        p = Problem('p')
+        p.enable_vote_store()
+
+        loaders.load(loaders.read_csv(io.StringIO(CSV)), p)
+
+        self.assertEqual(len(p.vote_store), 6)
+
+    def test_load_errors(self):
+        with self.assertRaises(loaders.LoadError) as cm:
+            loaders.load(
+                loaders.read_csv(
+                    io.StringIO('thesis,t1,true\nvote,u1,1,t2\n')),
+                Problem('p'))
+
+        self.assertEqual(cm.exception.line, 2)
+
+        with self.assertRaises(loaders.LoadError):
+            list(loaders.read_jsonl(io.StringIO('{"type": "thesis"}')))
+
+        with self.assertRaises(loaders.LoadError):
+            list(loaders.read_csv(io.StringIO('relation,other,t1,t2')))
+
+        thesis = '{"type": "thesis", "content": "t1", "solution": true}\n'
+
+        for vote in [
+            '{"type": "vote", "user": "u1", "vote": true, "thesis": "t1"}',
+            '{"type": "vote", "user": "u1", "vote": 1.0, "thesis": "t1"}',
+            '{"type": "vote", "user": "", "vote": 1, "thesis": "t1"}',
+            '{"type": "vote", "user": "u1", "vote": 1, "thesis": ["t1"]}',
+            '{"type": "vote", "user": ["u1"], "vote": 1, "thesis": "t1"}',
+        ]:
+            with self.assertRaises(loaders.LoadError) as cm:
+                loaders.load(
+                    loaders.read_jsonl(io.StringIO(thesis + vote)),
+                    Problem('p'))
+
+            self.assertEqual(cm.exception.line, 2)
+
+        with self.assertRaises(loaders.LoadError):
+            loaders.load(
+                loaders.read_csv(io.StringIO('thesis,t1,true\nvote,,1,t1')),
+                Problem('p'))
@@ -0,0 +1,47 @@
+from unittest import TestCase, skipUnless
+
+from dr.metrics import NO_METRICS, Recorder
+from dr import simple_solver
+
+try:
+    from dr import numpy_solver
+except ImportError:  # numpy is an optional extra
+    numpy_solver = None
+
+from .fixtures import debate
+
+
+class TestMetrics (TestCase):
+    def test_recorder(self):
+        self.check_recorder(simple_solver)
+
+        self.assertIs(simple_solver.Solver(debate()).metrics, NO_METRICS)
+
+    @skipUnless(numpy_solver, 'numpy is not installed')
+    def test_recorder_numpy(self):
+        self.check_recorder(numpy_solver)
+
+    def check_recorder(self, module):
+        p = debate()
+
+        metrics = Recorder()
+
+        solver = module.Solver(p, metrics=metrics)
+        solver.solve()
+
+        iterations = solver.report.iterations
+
+        self.assertEqual(len(metrics.timings['graph_analysis']), 1)
+        self.assertEqual(len(metrics.timings['contradictions']), 1)
+
+        for phase in ['all_users_strength', 'relations_strength',
+                      'theses_strength', 'contradictions_strength',
+                      'users_strength']:
+            self.assertEqual(len(metrics.timings[phase]), iterations)
+
+        self.assertEqual(metrics.counts['iterations'], iterations)
+        self.assertEqual(metrics.counts['contradictions'], 1)
+        self.assertEqual(metrics.counts['cones'], 2)
+        self.assertEqual(metrics.counts['cone_theses'], 3)
+        self.assertEqual(metrics.values['residual'],
+                         solver.report.residuals)
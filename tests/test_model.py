@@ -67,3 +67,96 @@ class TestModel (TestCase):
             self.fail('Should raise AssertionError')
         except AssertionError:
             pass
+
+    def test_problem_indexes(self):
+        u1 = User('u1')
+        u2 = User('u2')
+
+        t1 = Thesis('t1', False)
+        t2 = Thesis('t2', False)
+        t3 = Thesis('t3', False)
+
+        t1.upvote(u1)
+
+        p = Problem('q')
+
+        p.add_thesis(t1)
+        p.add_thesis(t2)
+        p.add_thesis(t3)
+
+        r12 = Relation(Relation.SUPPORT, t1, t2)
+        c23 = Relation(Relation.CONTRADICTION, t2, t3)
+
+        p.add_relation(r12)
+        p.add_relation(c23)
+        p.add_relation(Relation(Relation.SUPPORT, t1, t2))
+
+        self.assertEqual(p.supporting_relations[t2], [r12])
+        self.assertEqual(p.supported_relations[t1], [r12])
+        self.assertEqual(p.supporting_relations[t1], [])
+        self.assertEqual(p.contradiction_relations[t2], [c23])
+        self.assertEqual(p.contradiction_relations[t3], [c23])
+
+        # votes cast before and after insertion are both indexed
+
+        t2.downvote(u1)
+        c23.upvote(u2)
+
+        self.assertEqual(p.voters, {u1: {t1, t2}, u2: {c23}})
+
+    def test_fingerprint(self):
+        def build(order, votes):
+            theses = {c: Thesis(c, c == 't1') for c in ['t1', 't2', 't3']}
+
+            p = Problem('p')
+
+            for c in order:
+                p.add_thesis(theses[c])
+
+            r = Relation(Relation.SUPPORT, theses['t2'], theses['t1'])
+            c = Relation(Relation.CONTRADICTION, theses['t1'], theses['t3'])
+
+            for relation in (r, c) if order[0] == 't1' else (c, r):
+                p.add_relation(relation)
+
+            voted = {'t1': theses['t1'], 't3': theses['t3'], 'r': r, 'c': c}
+
+            for name, key, vote in votes:
+                if vote > 0:
+                    voted[key].upvote(User(name))
+                else:
+                    voted[key].downvote(User(name))
+
+            return p
+
+        votes = [('u1', 't1', 1), ('u2', 'r', 1), ('u1', 'c', -1)]
+
+        p1 = build(['t1', 't2', 't3'], votes)
+        p2 = build(['t3', 't2', 't1'], list(reversed(votes)))
+
+        self.assertEqual(p1.fingerprint, p2.fingerprint)
+        self.assertEqual(p1.graph_fingerprint, p2.graph_fingerprint)
+
+        # changing a vote back and forth restores the fingerprint
+
+        fingerprint = p1.fingerprint
+        t1 = next(t for t in p1.theses if t.content == 't1')
+
+        t1.downvote(User('u1'))
+
+        self.assertNotEqual(p1.fingerprint, fingerprint)
+        self.assertEqual(
+            p1.fingerprint,
+            build(['t1', 't2', 't3'],
+                  [('u1', 't1', -1)] + votes[1:]).fingerprint)
+
+        t1.upvote(User('u1'))
+
+        self.assertEqual(p1.fingerprint, fingerprint)
+
+        # votes do not change the graph fingerprint
+
+        p3 = build(['t1', 't2', 't3'], [])
+
+        self.assertEqual(p3.graph_fingerprint, p1.graph_fingerprint)
+        self.assertNotEqual(p3.fingerprint, p1.fingerprint)
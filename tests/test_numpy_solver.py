@@ -0,0 +1,445 @@
+import random
+from unittest import TestCase, skipUnless
+
+from dr.model import Thesis, Relation, User, Problem
+from dr import simple_solver
+
+try:
+    from dr import numpy_solver
+except ImportError:  # numpy is an optional extra
+    numpy_solver = None
+
+
+@skipUnless(numpy_solver, 'numpy is not installed')
+class TestNumpySolver (TestCase):
+    def assertSameStrengths(self, problem):
+        expected = simple_solver.Solver(problem)
+        actual = numpy_solver.Solver(problem)
+
+        self.assertEqual(actual.solve(), expected.solve())
+        self.assertEqual(actual.iteration, expected.iteration)
+
+        for user, user_data in expected.users.items():
+            self.assertAlmostEqual(
+                actual.users[user].strength, user_data.strength)
+
+        for thesis, thesis_data in expected.theses_data.items():
+            self.assertAlmostEqual(
+                actual.theses_data[thesis].strength, thesis_data.strength)
+
+        for relation, relation_data in expected.relations.items():
+            self.assertAlmostEqual(
+                actual.relations[relation].strength, relation_data.strength)
+
+    def test_iteration_1s0c0cy(self):
+        """
+        t2 -> t1
+        """
+
+        u1 = User('u1')
+        u2 = User('u2')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', True)
+
+        r = Relation(Relation.SUPPORT, t2, t1)
+
+        p = Problem('p')
+
+        p.add_thesis(t1)
+        p.add_thesis(t2)
+
+        p.add_relation(r)
+
+        t1.upvote(u1)
+        t2.upvote(u2)
+        r.upvote(u1)
+
+        solver = numpy_solver.Solver(p)
+
+        self.assertEqual(solver.all_users_strength, 2)
+        self.assertEqual(solver.solve(), t1)
+
+        self.assertSameStrengths(p)
+
+    def test_iteration_0s1c0cy(self):
+        """
+        t2 -x- t1
+        """
+
+        u1 = User('u1')
+        u2 = User('u2')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', True)
+
+        r = Relation(Relation.CONTRADICTION, t2, t1)
+
+        p = Problem('p')
+
+        p.add_thesis(t1)
+        p.add_thesis(t2)
+
+        p.add_relation(r)
+
+        t1.upvote(u1)
+        t1.upvote(u2)
+        t2.upvote(u2)
+        r.upvote(u1)
+
+        solver = numpy_solver.Solver(p)
+
+        self.assertEqual(solver.solve(), t1)
+        self.assertTrue(solver.users[u2].strength < 1)
+
+        self.assertSameStrengths(p)
+
+    def test_iteration_levels(self):
+        """
+        t4 -> t3 -> t1 <- t2
+        t4 -------------^
+        t5 -x- t1
+        """
+
+        u1 = User('u1')
+        u2 = User('u2')
+        u3 = User('u3')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', False)
+        t3 = Thesis('t3', False)
+        t4 = Thesis('t4', False)
+        t5 = Thesis('t5', True)
+
+        r43 = Relation(Relation.SUPPORT, t4, t3)
+        r31 = Relation(Relation.SUPPORT, t3, t1)
+        r21 = Relation(Relation.SUPPORT, t2, t1)
+        r41 = Relation(Relation.SUPPORT, t4, t1)
+        c51 = Relation(Relation.CONTRADICTION, t5, t2)
+
+        p = Problem('p')
+
+        for t in [t1, t2, t3, t4, t5]:
+            p.add_thesis(t)
+
+        for r in [r43, r31, r21, r41, c51]:
+            p.add_relation(r)
+
+        t1.upvote(u1)
+        t2.upvote(u2)
+        t3.upvote(u3)
+        t4.upvote(u1)
+        t4.downvote(u2)
+        t5.upvote(u2)
+        t5.upvote(u3)
+        r43.upvote(u1)
+        r31.upvote(u2)
+        r21.upvote(u3)
+        r41.upvote(u3)
+        c51.upvote(u1)
+
+        self.assertSameStrengths(p)
+
+    def test_iteration_path_contradiction(self):
+        r"""
+        t5 -> t4 -> t3 -> t1 -x- t2 <- t6
+               \---------^
+        """
+
+        u1 = User('u1')
+        u2 = User('u2')
+        u3 = User('u3')
+
+        t1, t2, t3, t4, t5, t6 = [
+            Thesis('t%s' % i, i < 3) for i in range(1, 7)
+        ]
+
+        r54 = Relation(Relation.SUPPORT, t5, t4)
+        r43 = Relation(Relation.SUPPORT, t4, t3)
+        r31 = Relation(Relation.SUPPORT, t3, t1)
+        r41 = Relation(Relation.SUPPORT, t4, t1)
+        r62 = Relation(Relation.SUPPORT, t6, t2)
+        c12 = Relation(Relation.CONTRADICTION, t1, t2)
+
+        p = Problem('p')
+
+        for t in [t1, t2, t3, t4, t5, t6]:
+            p.add_thesis(t)
+
+        for r in [r54, r43, r31, r41, r62, c12]:
+            p.add_relation(r)
+
+        t1.upvote(u1)
+        t2.upvote(u2)
+        t3.upvote(u1)
+        t4.upvote(u3)
+        t5.upvote(u2)
+        t5.upvote(u3)
+        t6.upvote(u1)
+        r54.upvote(u1)
+        r43.upvote(u2)
+        r31.upvote(u3)
+        r41.upvote(u1)
+        r62.upvote(u2)
+        c12.upvote(u3)
+
+        solver = numpy_solver.Solver(p)
+
+        self.assertTrue(solver.cone_levels)
+
+        self.assertSameStrengths(p)
+
+    def test_iteration_random(self):
+        rnd = random.Random(3)
+
+        for _ in range(20):
+            users = [User('u%s' % i) for i in range(5)]
+            theses = [Thesis('t%s' % i, i < 3) for i in range(8)]
+
+            p = Problem('p')
+
+            for t in theses:
+                p.add_thesis(t)
+
+            for _ in range(12):
+                t1, t2 = rnd.sample(theses, 2)
+
+                p.add_relation(Relation(
+                    rnd.choice([Relation.SUPPORT, Relation.SUPPORT,
+                                Relation.CONTRADICTION]),
+                    t1, t2))
+
+            for voted in sorted(p.theses, key=str) + \
+                    sorted(p.relations, key=str):
+                for u in rnd.sample(users, rnd.randint(1, 3)):
+                    voted.upvote(u)
+
+            # compare a fixed number of iterations: random problems are not
+            # guaranteed to converge
+            expected = simple_solver.Solver(p)
+            actual = numpy_solver.Solver(p)
+
+            for _ in range(4):
+                expected._iterate()
+                actual._iterate()
+
+            actual._store_strengths()
+
+            for user, user_data in expected.users.items():
+                self.assertAlmostEqual(
+                    actual.users[user].next_strength, user_data.next_strength)
+
+            for thesis, thesis_data in expected.theses_data.items():
+                self.assertAlmostEqual(
+                    actual.theses_data[thesis].strength, thesis_data.strength)
+
+    def test_user_classes(self):
+        rnd = random.Random(4)
+
+        for vote_store in [False, True]:
+            theses = [Thesis('t%s' % i, i < 3) for i in range(8)]
+
+            p = Problem('p')
+
+            if vote_store:
+                p.enable_vote_store()
+
+            for t in theses:
+                p.add_thesis(t)
+
+            for _ in range(12):
+                t1, t2 = rnd.sample(theses, 2)
+
+                p.add_relation(Relation(
+                    rnd.choice([Relation.SUPPORT, Relation.CONTRADICTION]),
+                    t1, t2))
+
+            voted = sorted(p.theses, key=str) + sorted(p.relations, key=str)
+
+            # parties of users casting the same votes
+            for party, size in enumerate([8, 3, 1]):
+                ballot = rnd.sample(voted, 5)
+
+                for i in range(size):
+                    user = User('p%s-u%s' % (party, i))
+
+                    for v in ballot:
+                        v.upvote(user)
+
+            expected = simple_solver.Solver(p)
+            actual = numpy_solver.Solver(p)
+
+            self.assertEqual(len(actual.user_list), 3)
+
+            for _ in range(4):
+                expected._iterate()
+                actual._iterate()
+
+            actual._store_strengths()
+
+            for user, user_data in expected.users.items():
+                self.assertAlmostEqual(
+                    actual.users[user].next_strength, user_data.next_strength)
+
+            for thesis, thesis_data in expected.theses_data.items():
+                self.assertAlmostEqual(
+                    actual.theses_data[thesis].strength, thesis_data.strength)
+
+    def test_approximate_contradictions(self):
+        rnd = random.Random(13)
+
+        for _ in range(10):
+            users = [User('u%s' % i) for i in range(6)]
+            theses = [Thesis('t%s' % i, i < 3) for i in range(14)]
+
+            p = Problem('p')
+
+            for t in theses:
+                p.add_thesis(t)
+
+            for i in range(1, len(theses)):
+                p.add_relation(Relation(
+                    Relation.SUPPORT, theses[i], theses[rnd.randrange(i)]))
+
+            for _ in range(3):
+                t1, t2 = rnd.sample(theses, 2)
+
+                p.add_relation(Relation(Relation.CONTRADICTION, t1, t2))
+
+            for voted in sorted(p.theses, key=str) + \
+                    sorted(p.relations, key=str):
+                for u in rnd.sample(users, rnd.randint(1, 3)):
+                    voted.upvote(u)
+
+            for max_depth, epsilon in [(1, 0), (None, .2), (2, .1)]:
+                expected = simple_solver.Solver(
+                    p, max_depth=max_depth, epsilon=epsilon)
+                actual = numpy_solver.Solver(
+                    p, max_depth=max_depth, epsilon=epsilon)
+
+                for _ in range(3):
+                    expected._iterate()
+                    actual._iterate()
+
+                    self.assertAlmostEqual(
+                        actual._error_bound(), expected._error_bound())
+
+                actual._store_strengths()
+
+                for user, user_data in expected.users.items():
+                    self.assertAlmostEqual(
+                        actual.users[user].next_strength,
+                        user_data.next_strength)
+
+    def test_no_users_strength(self):
+        """
+        t1 -x- t2, both voted by the only user
+        """
+
+        u1 = User('u1')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', True)
+
+        c12 = Relation(Relation.CONTRADICTION, t1, t2)
+
+        p = Problem('p')
+
+        p.add_thesis(t1)
+        p.add_thesis(t2)
+        p.add_relation(c12)
+
+        for voted in [t1, t2, c12]:
+            voted.upvote(u1)
+
+        self.assertSameStrengths(p)
+
+    def test_no_solution(self):
+        t1 = Thesis('t1', False)
+
+        p = Problem('p')
+
+        p.add_thesis(t1)
+
+        t1.upvote(User('u1'))
+
+        self.assertTrue(numpy_solver.Solver(p).solve() is None)
+
+    def test_tie_break(self):
+        u1 = User('u1')
+
+        p = Problem('p')
+
+        for content in ['b', 'c', 'a', 'd']:
+            t = Thesis(content, content != 'a')
+            p.add_thesis(t)
+            t.upvote(u1)
+
+        self.assertEqual(simple_solver.Solver(p).solve().content, 'b')
+        self.assertEqual(numpy_solver.Solver(p).solve().content, 'b')
+
+    def test_iter_solve(self):
+        u1 = User('u1')
+
+        p = Problem('p')
+
+        for content in ['b', 'c', 'a', 'd']:
+            t = Thesis(content, content != 'a')
+            p.add_thesis(t)
+            t.upvote(u1)
+
+        expected = list(simple_solver.Solver(p).iter_solve(top_k=2))
+        actual = list(numpy_solver.Solver(p).iter_solve(top_k=2))
+
+        self.assertEqual(len(actual), len(expected))
+
+        for a, e in zip(actual, expected):
+            self.assertEqual(a.leader, e.leader)
+            self.assertEqual([t for t, _ in a.ranking],
+                             [t for t, _ in e.ranking])
+
+    def test_apply_votes(self):
+        """
+        t3 -> t1 -x- t2
+        """
+
+        u1 = User('u1')
+        u2 = User('u2')
+        u3 = User('u3')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', True)
+        t3 = Thesis('t3', False)
+
+        r31 = Relation(Relation.SUPPORT, t3, t1)
+        c12 = Relation(Relation.CONTRADICTION, t1, t2)
+
+        p = Problem('p')
+
+        for t in [t1, t2, t3]:
+            p.add_thesis(t)
+
+        p.add_relation(r31)
+        p.add_relation(c12)
+
+        t1.upvote(u2)
+        t2.upvote(u1)
+        r31.upvote(u2)
+        c12.upvote(u2)
+
+        expected = simple_solver.Solver(p)
+        actual = numpy_solver.Solver(p)
+
+        self.assertEqual(actual.solve(), expected.solve())
+
+        votes = [(t3, u1, +1), (t2, u3, +1)]
+
+        expected.apply_votes(votes)
+        actual.apply_votes(votes)
+
+        self.assertEqual(actual.resolve(), expected.resolve())
+        self.assertEqual(actual.iteration, expected.iteration)
+
+        for user, user_data in expected.users.items():
+            self.assertAlmostEqual(
+                actual.users[user].strength, user_data.strength)
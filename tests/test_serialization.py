@@ -0,0 +1,54 @@
+import pickle
+import random
+from unittest import TestCase
+
+from dr.model import Thesis, Relation, User, Problem
+from dr import serialization
+
+
+class TestSerialization (TestCase):
+    def test_round_trip(self):
+        rnd = random.Random(1)
+
+        users = [User('u%s' % i) for i in range(4)]
+        theses = [Thesis('t%s' % i, i < 2) for i in range(6)]
+
+        p = Problem('p')
+
+        for t in theses:
+            p.add_thesis(t)
+
+        for _ in range(8):
+            t1, t2 = rnd.sample(theses, 2)
+
+            p.add_relation(Relation(
+                rnd.choice([Relation.SUPPORT, Relation.CONTRADICTION]),
+                t1, t2))
+
+        for voted in list(p.theses) + list(p.relations):
+            for u in rnd.sample(users, 2):
+                voted.upvote(u) if rnd.random() < .7 else voted.downvote(u)
+
+        data, encoded_theses = serialization.encode(p)
+
+        decoded, decoded_theses = serialization.decode(
+            pickle.loads(pickle.dumps(data)))
+
+        self.assertEqual(decoded.question, p.question)
+        self.assertEqual(decoded.theses, p.theses)
+        self.assertEqual(decoded.relations, p.relations)
+        self.assertEqual(decoded_theses, encoded_theses)
+        self.assertEqual(decoded.voters.keys(), p.voters.keys())
+
+        for voted in decoded.theses | decoded.relations:
+            original = next(
+                v for v in p.theses | p.relations if v == voted)
+
+            self.assertEqual(voted.votes, original.votes)
+            self.assertIsNot(voted, original)
+
+        for relation in decoded.relations:
+            self.assertIn(relation.thesis1, decoded.theses)
+            self.assertIs(
+                relation.type,
+                next(r for r in p.relations if r == relation).type)
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from dr.model import Thesis, User
+from dr.service import Busy, TallyService, serve
+from dr.simple_solver import Solver
+
+from .fixtures import debate, thesis
+
+
+class CountingSolver (Solver):
+    solves = 0
+    # solves wait for it, when set
+    gate = None
+
+    def solve(self):
+        CountingSolver.solves += 1
+
+        if CountingSolver.gate is not None:
+            CountingSolver.gate.wait(5)
+
+        return super().solve()
+
+
+class FailingSolver (Solver):
+    def solve(self):
+        raise ZeroDivisionError()
+
+
+class TestService (TestCase):
+    def setUp(self):
+        CountingSolver.solves = 0
+        CountingSolver.gate = None
+
+    def test_coalescing(self):
+        p = debate()
+
+        async def run():
+            service = TallyService(solver=CountingSolver)
+            service.register('p', p)
+
+            tallies = await asyncio.gather(
+                *[service.winner('p') for _ in range(5)])
+
+            self.assertEqual(CountingSolver.solves, 1)
+
+            for tally in tallies:
+                self.assertEqual(tally.winner, Solver(p).solve())
+                self.assertEqual(tally.revision, p.revision)
+                self.assertFalse(tally.stale)
+
+            # solved already
+            await service.winner('p')
+
+            self.assertEqual(CountingSolver.solves, 1)
+
+            # stale reads while solving again
+            t2 = thesis(p, 't2')
+            t2.upvote(User('u3'))
+
+            tally = await service.winner('p')
+
+            self.assertTrue(tally.stale)
+            self.assertEqual(tally.revision, tallies[0].revision)
+
+            tally = await service.winner('p', fresh=True)
+
+            self.assertFalse(tally.stale)
+            self.assertEqual(tally.revision, p.revision)
+            self.assertEqual(CountingSolver.solves, 2)
+
+        asyncio.run(run())
+
+    def test_busy(self):
+        CountingSolver.gate = threading.Event()
+
+        async def run():
+            service = TallyService(solver=CountingSolver, max_pending=1)
+            service.register('p1', debate())
+            service.register('p2', debate())
+
+            first = asyncio.ensure_future(service.winner('p1'))
+            await asyncio.sleep(0)
+
+            with self.assertRaises(Busy):
+                await service.winner('p2')
+
+            CountingSolver.gate.set()
+
+            await first
+            await service.winner('p2')
+
+            # while busy, stale reads get the last completed result
+
+            CountingSolver.gate.clear()
+
+            p2 = service.problems['p2']
+            revision = p2.revision
+
+            t2 = thesis(p2, 't2')
+            t2.upvote(User('u3'))
+
+            first = asyncio.ensure_future(service.winner('p1', fresh=True))
+            service.problems['p1'].add_thesis(Thesis('t4', False))
+            await asyncio.sleep(0)
+
+            tally = await service.winner('p2')
+
+            self.assertTrue(tally.stale)
+            self.assertEqual(tally.revision, revision)
+
+            with self.assertRaises(Busy):
+                await service.winner('p2', fresh=True)
+
+            CountingSolver.gate.set()
+
+            await first
+
+        asyncio.run(run())
+
+    def test_serve(self):
+        path = os.path.join(tempfile.mkdtemp(), 'tally.sock')
+
+        async def run():
+            service = TallyService()
+            service.register('p', debate())
+
+            server = await serve(service, path)
+
+            reader, writer = await asyncio.open_unix_connection(path)
+
+            answers = []
+
+            for request in [{'problem': 'p'}, {'problem': 'q'}, 'x']:
+                writer.write(json.dumps(request).encode('utf-8') + b'\n')
+                await writer.drain()
+
+                answers.append(json.loads(await reader.readline()))
+
+            writer.close()
+            server.close()
+            await server.wait_closed()
+
+            return answers
+
+        answers = asyncio.run(run())
+
+        os.remove(path)
+
+        self.assertEqual(answers[0]['winner'], 't1')
+        self.assertFalse(answers[0]['stale'])
+        self.assertEqual(
+            answers[1], {'problem': 'q', 'error': 'unknown problem'})
+        self.assertEqual(answers[2], {'error': 'illegal request'})
+
+    def test_serve_failure(self):
+        path = os.path.join(tempfile.mkdtemp(), 'tally.sock')
+
+        async def run():
+            service = TallyService(solver=FailingSolver)
+            service.register('p', debate())
+
+            server = await serve(service, path)
+
+            reader, writer = await asyncio.open_unix_connection(path)
+
+            writer.write(b'{"problem": "p"}\n')
+            await writer.drain()
+
+            answer = json.loads(await reader.readline())
+
+            writer.close()
+            server.close()
+            await server.wait_closed()
+
+            return answer
+
+        with self.assertLogs('dr.service', 'ERROR'):
+            answer = asyncio.run(run())
+
+        os.remove(path)
+
+        self.assertEqual(answer, {'problem': 'p', 'error': 'solve failed'})
@@ -4,6 +4,7 @@ from dr.model import Thesis, Relation, User, Problem
 from dr.simple_solver import Solver
 
 import logging
+import random
 import sys
 
 
@@ -14,6 +15,38 @@ import sys
 # logger.addHandler(stream_handler)
 
 
+def path_pruned_relations(problem):
+    """
+    Reference cycle pruning: grow every support path until it repeats
+    a thesis, and collect the relations of the repeating paths.
+    """
+
+    supporting = {}
+
+    for r in problem.relations:
+        if r.type is Relation.SUPPORT:
+            supporting.setdefault(r.thesis2, []).append(r)
+
+    paths = [[r] for rs in supporting.values() for r in rs]
+    pruned = set()
+
+    while paths:
+        new_paths = []
+
+        for path in paths:
+            theses = {r.thesis2 for r in path} | {path[-1].thesis1}
+
+            for r in supporting.get(path[-1].thesis1, []):
+                if r.thesis1 in theses:
+                    pruned.update(path + [r])
+                else:
+                    new_paths.append(path + [r])
+
+        paths = new_paths
+
+    return pruned
+
+
 class TestSimpleSolver (TestCase):
     def test_graph_analysis_1s0c0cy(self):
         """
@@ -60,6 +93,8 @@ class TestSimpleSolver (TestCase):
             t2,
             t1,
         ])
+        self.assertEqual(solver.theses_levels, [[t2], [t1]])
+        self.assertEqual(solver.theses_data[t1].level, 1)
 
     def test_graph_analysis_4s0c1cy(self):
         """
@@ -234,3 +269,624 @@ class TestSimpleSolver (TestCase):
         solution = solver.solve()
 
         self.assertEqual(solution, t1)
+
+    def test_graph_analysis_pruning(self):
+        """
+        t1 -> t2 <-> t3 -> t4 -> t5
+        """
+
+        t1, t2, t3, t4, t5 = [Thesis('t%s' % i, True) for i in range(1, 6)]
+
+        r12 = Relation(Relation.SUPPORT, t1, t2)
+        r23 = Relation(Relation.SUPPORT, t2, t3)
+        r32 = Relation(Relation.SUPPORT, t3, t2)
+        r34 = Relation(Relation.SUPPORT, t3, t4)
+        r45 = Relation(Relation.SUPPORT, t4, t5)
+
+        p = Problem('p')
+
+        for t in [t1, t2, t3, t4, t5]:
+            p.add_thesis(t)
+
+        for r in [r12, r23, r32, r34, r45]:
+            p.add_relation(r)
+
+        solver = Solver(p)
+
+        self.assertEqual(solver.theses_data[t2].supporting_relations, [r12])
+        self.assertEqual(solver.theses_data[t3].supporting_relations, [])
+        self.assertEqual(solver.theses_data[t4].supporting_relations, [])
+        self.assertEqual(solver.theses_data[t5].supporting_relations, [])
+
+    def test_graph_analysis_pruning_random(self):
+        rnd = random.Random(42)
+
+        for _ in range(50):
+            theses = [Thesis('t%s' % i, True) for i in range(8)]
+
+            p = Problem('p')
+
+            for t in theses:
+                p.add_thesis(t)
+
+            for _ in range(rnd.randint(0, 12)):
+                p.add_relation(Relation(
+                    Relation.SUPPORT, rnd.choice(theses), rnd.choice(theses)))
+
+            solver = Solver(p)
+
+            pruned = path_pruned_relations(p)
+
+            for t, thesis_data in solver.theses_data.items():
+                self.assertEqual(
+                    set(thesis_data.supporting_relations),
+                    {
+                        r
+                        for r in p.relations
+                        if r.type is Relation.SUPPORT and r.thesis2 == t
+                    } - pruned
+                )
+
+    def test_iteration_1s1c0cy(self):
+        """
+        t3 -> t1 -x- t2
+        """
+
+        u1 = User('u1')
+        u2 = User('u2')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', True)
+        t3 = Thesis('t3', False)
+
+        r31 = Relation(Relation.SUPPORT, t3, t1)
+        c12 = Relation(Relation.CONTRADICTION, t1, t2)
+
+        p = Problem('p')
+
+        p.add_thesis(t1)
+        p.add_thesis(t2)
+        p.add_thesis(t3)
+
+        p.add_relation(r31)
+        p.add_relation(c12)
+
+        t1.upvote(u2)
+        t2.upvote(u1)
+        t3.upvote(u1)
+        t3.upvote(u2)
+        r31.upvote(u1)
+        r31.upvote(u2)
+        c12.upvote(u2)
+
+        solver = Solver(p)
+
+        self.assertEqual(len(solver.contradictions), 1)
+
+        contradiction = solver.users[u1].contradictions[c12]
+
+        self.assertEqual(contradiction.theses1, {t3})
+        self.assertEqual(contradiction.theses2, {t2})
+        self.assertEqual(solver.users[u2].contradictions, {})
+
+        self.assertEqual(solver.solve(), t1)
+        self.assertTrue(solver.users[u1].strength < 1)
+        self.assertEqual(solver.users[u2].strength, 1)
+
+    def test_contradictions_best_path_random(self):
+        rnd = random.Random(7)
+
+        for _ in range(30):
+            users = [User('u%s' % i) for i in range(4)]
+            theses = [Thesis('t%s' % i, i < 3) for i in range(7)]
+
+            p = Problem('p')
+
+            for t in theses:
+                p.add_thesis(t)
+
+            for _ in range(10):
+                t1, t2 = rnd.sample(theses, 2)
+
+                p.add_relation(Relation(
+                    rnd.choice([Relation.SUPPORT, Relation.SUPPORT,
+                                Relation.CONTRADICTION]),
+                    t1, t2))
+
+            for voted in sorted(p.theses, key=str) + \
+                    sorted(p.relations, key=str):
+                for u in rnd.sample(users, rnd.randint(1, 3)):
+                    voted.upvote(u)
+
+            # the dynamic programming must hold at every iteration,
+            # convergence is not needed
+            solver = Solver(p)
+
+            for _ in range(3):
+                solver._iterate()
+
+            def norm(t):
+                return solver.theses_data[t].strength / \
+                    solver.max_theses_strength
+
+            def best_paths(thesis, end):
+                # greatest product over every support path thesis -> end
+                if thesis == end:
+                    return 1
+
+                products = [
+                    solver.relations[r].strength * norm(thesis) * b
+                    for d in solver.theses_data.values()
+                    for r in d.supporting_relations
+                    if r.thesis1 == thesis
+                    for b in [best_paths(r.thesis2, end)]
+                    if b is not None
+                ]
+
+                return max(products, default=None)
+
+            for u, user_data in solver.users.items():
+                for c, contradiction in user_data.contradictions.items():
+                    voted = [t for t in theses if u in t.votes]
+
+                    products = [
+                        [
+                            b
+                            for b in [best_paths(t, end) for t in voted]
+                            if b is not None
+                        ]
+                        for end in [c.thesis1, c.thesis2]
+                    ]
+
+                    self.assertAlmostEqual(
+                        1 - contradiction.strength,
+                        solver.relations[c].strength *
+                        norm(c.thesis1) * norm(c.thesis2) *
+                        max(products[0]) * max(products[1])
+                    )
+
+    def test_apply_votes(self):
+        """
+        t3 -> t1 -x- t2
+        """
+
+        u1 = User('u1')
+        u2 = User('u2')
+        u3 = User('u3')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', True)
+        t3 = Thesis('t3', False)
+
+        r31 = Relation(Relation.SUPPORT, t3, t1)
+        c12 = Relation(Relation.CONTRADICTION, t1, t2)
+
+        p = Problem('p')
+
+        p.add_thesis(t1)
+        p.add_thesis(t2)
+        p.add_thesis(t3)
+
+        p.add_relation(r31)
+        p.add_relation(c12)
+
+        t1.upvote(u2)
+        t2.upvote(u1)
+        r31.upvote(u2)
+        c12.upvote(u2)
+
+        solver = Solver(p)
+
+        self.assertEqual(solver.solve(), t1)
+        self.assertEqual(solver.users[u1].contradictions, {})
+
+        iterations = solver.iteration
+
+        solver.apply_votes([
+            (t3, u1, +1),
+            (t2, u3, +1),
+            (r31, u3, -1),
+        ])
+
+        self.assertTrue(u3 in solver.users)
+        self.assertEqual(
+            solver.users[u1].contradictions[c12].theses1, {t3})
+
+        solution = solver.resolve()
+
+        fresh = Solver(p)
+
+        self.assertEqual(solution, fresh.solve())
+        self.assertTrue(solver.iteration - iterations <= fresh.iteration)
+
+        for user, user_data in fresh.users.items():
+            self.assertAlmostEqual(
+                solver.users[user].strength, user_data.strength, places=1)
+
+        # theses on one side only do not make a contradiction
+
+        solver.apply_votes([(t3, u2, +1)])
+
+        self.assertTrue(c12 not in solver.users[u2].contradictions)
+
+    def test_apply_votes_dirty_set(self):
+        """
+        t4 -> t3 -> t2 -> t1    t5 -> t6
+        """
+
+        u1 = User('u1')
+        u2 = User('u2')
+
+        t1, t2, t3, t4, t5, t6 = [
+            Thesis('t%s' % i, i in (1, 6)) for i in range(1, 7)
+        ]
+
+        r43 = Relation(Relation.SUPPORT, t4, t3)
+        r32 = Relation(Relation.SUPPORT, t3, t2)
+        r21 = Relation(Relation.SUPPORT, t2, t1)
+        r56 = Relation(Relation.SUPPORT, t5, t6)
+
+        p = Problem('p')
+
+        for t in [t1, t2, t3, t4, t5, t6]:
+            p.add_thesis(t)
+            t.upvote(u1)
+
+        for r in [r43, r32, r21, r56]:
+            p.add_relation(r)
+            r.upvote(u2)
+
+        solver = Solver(p)
+        solver.solve()
+
+        recomputed = []
+        direct_votes_strength = solver._direct_votes_strength
+
+        def counting_direct_votes_strength(voted_object):
+            recomputed.append(voted_object)
+
+            return direct_votes_strength(voted_object)
+
+        solver._direct_votes_strength = counting_direct_votes_strength
+
+        solver.apply_votes([(r32, u1, +1)])
+        solver.resolve()
+
+        # users strength does not change, so only r32 and the theses it
+        # supports are recomputed
+        self.assertEqual(set(recomputed), {r32, t2, t1})
+
+        fresh = Solver(p)
+        fresh.solve()
+
+        for thesis, thesis_data in fresh.theses_data.items():
+            self.assertAlmostEqual(
+                solver.theses_data[thesis].strength, thesis_data.strength)
+
+        self.assertEqual(solver.max_theses_strength,
+                         fresh.max_theses_strength)
+
+        # only moving users count towards the residual
+        user_data = solver.users[u1]
+        user_data.next_strength = user_data.strength + 1
+
+        solver.moving_users.clear()
+        self.assertEqual(solver._residual(), 0)
+
+        solver.moving_users.add(user_data)
+        self.assertAlmostEqual(solver._residual(), 1)
+
+    def test_max_iterations(self):
+        u1 = User('u1')
+        u2 = User('u2')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', True)
+
+        c12 = Relation(Relation.CONTRADICTION, t1, t2)
+
+        p = Problem('p')
+
+        p.add_thesis(t1)
+        p.add_thesis(t2)
+        p.add_relation(c12)
+
+        t1.upvote(u1)
+        t1.upvote(u2)
+        t2.upvote(u1)
+        c12.upvote(u1)
+
+        # a negative threshold is never reached
+        solver = Solver(p, error_threshold=-1, max_iterations=5)
+
+        self.assertEqual(solver.solve(), t1)
+        self.assertEqual(solver.report.iterations, 5)
+        self.assertEqual(len(solver.report.residuals), 5)
+        self.assertFalse(solver.report.converged)
+
+        solver = Solver(p)
+        solver.solve()
+
+        self.assertTrue(solver.report.converged)
+        self.assertTrue(solver.report.residual <= solver.error_threshold)
+
+    def test_parallel_contradictions(self):
+        rnd = random.Random(11)
+
+        users = [User('u%s' % i) for i in range(10)]
+        theses = [Thesis('t%s' % i, i < 5) for i in range(40)]
+
+        p = Problem('p')
+
+        for t in theses:
+            p.add_thesis(t)
+
+        while len(p.relations) < 200:
+            t1, t2 = rnd.sample(theses, 2)
+
+            p.add_relation(Relation(
+                rnd.choice([Relation.SUPPORT, Relation.CONTRADICTION]),
+                t1, t2))
+
+        for voted in sorted(p.theses, key=str) + sorted(p.relations, key=str):
+            for u in rnd.sample(users, rnd.randint(1, 3)):
+                voted.upvote(u)
+
+        expected = Solver(p)
+        actual = Solver(p, workers=2)
+
+        def contradictions(solver):
+            # contradictions hold user classes, see Solver._group_users
+            return {
+                (c.contradiction_relation, c.theses1, c.theses2): {
+                    u for u, d in solver.users.items() if d in c.users
+                }
+                for c in solver.contradictions
+            }
+
+        self.assertTrue(expected.contradictions)
+        self.assertEqual(contradictions(actual), contradictions(expected))
+
+        for relation, cones in expected.cones.items():
+            for cone, actual_cone in zip(cones, actual.cones[relation]):
+                self.assertEqual(actual_cone.theses, cone.theses)
+                self.assertEqual(
+                    set(actual_cone.relations), set(cone.relations))
+
+        self.assertEqual(actual.theses_cones, expected.theses_cones)
+        self.assertEqual(actual.relations_cones, expected.relations_cones)
+
+    def test_iter_solve(self):
+        u1 = User('u1')
+        u2 = User('u2')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', True)
+        t3 = Thesis('t3', True)
+
+        c12 = Relation(Relation.CONTRADICTION, t1, t2)
+
+        p = Problem('p')
+
+        for t in [t1, t2, t3]:
+            p.add_thesis(t)
+
+        p.add_relation(c12)
+
+        t1.upvote(u1)
+        t1.upvote(u2)
+        t2.upvote(u1)
+        t3.upvote(u2)
+        c12.upvote(u1)
+
+        solver = Solver(p)
+
+        progress = list(solver.iter_solve(top_k=2))
+
+        self.assertEqual(len(progress), solver.report.iterations)
+        self.assertEqual([s.iteration for s in progress],
+                         list(range(1, len(progress) + 1)))
+        self.assertTrue(progress[-1].converged)
+        self.assertFalse(any(s.converged for s in progress[:-1]))
+        self.assertEqual(progress[-1].leader, Solver(p).solve())
+        self.assertEqual(progress[-1].residual, solver.report.residual)
+
+        ranking = progress[-1].ranking
+
+        self.assertEqual(len(ranking), 2)
+        self.assertEqual(ranking[0][0], progress[-1].leader)
+        self.assertTrue(ranking[0][1] >= ranking[1][1])
+
+        # an exhausted budget stops after one iteration
+
+        solver = Solver(p, error_threshold=-1)
+
+        self.assertEqual(solver.solve(time_budget=0), t1)
+        self.assertEqual(solver.report.iterations, 1)
+        self.assertFalse(solver.report.converged)
+
+    def test_user_classes(self):
+        rnd = random.Random(5)
+
+        theses = [Thesis('t%s' % i, i < 4) for i in range(12)]
+
+        p = Problem('p')
+
+        for t in theses:
+            p.add_thesis(t)
+
+        while len(p.relations) < 24:
+            t1, t2 = rnd.sample(theses, 2)
+
+            p.add_relation(Relation(
+                rnd.choice([Relation.SUPPORT, Relation.CONTRADICTION]),
+                t1, t2))
+
+        voted = sorted(p.theses, key=str) + sorted(p.relations, key=str)
+
+        # parties of identical voters, and a few independent ones
+        users = []
+
+        for party, size in enumerate([20, 10, 5, 1, 1]):
+            ballot = [
+                (v, rnd.choice([+1, +1, -1]))
+                for v in rnd.sample(voted, 6)
+            ]
+
+            for i in range(size):
+                user = User('p%s-u%s' % (party, i))
+                users.append(user)
+
+                for v, vote in ballot:
+                    if vote > 0:
+                        v.upvote(user)
+                    else:
+                        v.downvote(user)
+
+        grouped = Solver(p)
+
+        self.assertEqual(len(grouped.users), 37)
+        self.assertEqual(len(grouped.user_classes), 5)
+        self.assertEqual(
+            sorted(d.weight for d in grouped.user_classes), [1, 1, 5, 10, 20])
+
+        # every user in a class of its own
+        ungrouped = Solver(p)
+
+        for user in users:
+            ungrouped._ungroup_user(user)
+
+        self.assertEqual(len(ungrouped.user_classes), 37)
+
+        self.assertEqual(grouped.solve(), ungrouped.solve())
+        self.assertEqual(grouped.iteration, ungrouped.iteration)
+
+        for user in users:
+            self.assertAlmostEqual(
+                grouped.users[user].strength, ungrouped.users[user].strength)
+
+        for thesis in theses:
+            self.assertAlmostEqual(
+                grouped.theses_data[thesis].strength,
+                ungrouped.theses_data[thesis].strength)
+
+        # a voter leaving the party line gets a class of its own
+
+        grouped.apply_votes([(theses[0], users[0], -1)])
+
+        self.assertEqual(len(grouped.user_classes), 6)
+        self.assertEqual(grouped.users[users[0]].weight, 1)
+        self.assertEqual(grouped.users[users[1]].weight, 19)
+
+        solution = grouped.resolve()
+        fresh = Solver(p)
+
+        self.assertEqual(solution, fresh.solve())
+
+        for thesis in theses:
+            self.assertAlmostEqual(
+                grouped.theses_data[thesis].strength,
+                fresh.theses_data[thesis].strength, places=2)
+
+    def test_approximate_contradictions(self):
+        rnd = random.Random(13)
+
+        checked = 0
+
+        for _ in range(20):
+            users = [User('u%s' % i) for i in range(6)]
+            theses = [Thesis('t%s' % i, i < 3) for i in range(14)]
+
+            p = Problem('p')
+
+            for t in theses:
+                p.add_thesis(t)
+
+            # support chains, so cones are deep
+            for i in range(1, len(theses)):
+                p.add_relation(Relation(
+                    Relation.SUPPORT, theses[i], theses[rnd.randrange(i)]))
+
+            for _ in range(3):
+                t1, t2 = rnd.sample(theses, 2)
+
+                p.add_relation(
+                    Relation(Relation.CONTRADICTION, t1, t2))
+
+            for voted in sorted(p.theses, key=str) + \
+                    sorted(p.relations, key=str):
+                for u in rnd.sample(users, rnd.randint(1, 3)):
+                    voted.upvote(u)
+
+            exact = Solver(p)
+            exact._iterate()
+
+            # deep enough is exact
+            solver = Solver(p, max_depth=len(theses))
+
+            self.assertTrue(solver.approximate)
+
+            solver._iterate()
+
+            self.assertEqual(solver._error_bound(), 0)
+
+            for user, user_data in exact.users.items():
+                self.assertEqual(
+                    solver.users[user].next_strength, user_data.next_strength)
+
+            for max_depth, epsilon in [(0, 0), (1, 0), (2, 0), (None, .1),
+                                       (None, .5), (2, .1)]:
+                solver = Solver(p, max_depth=max_depth, epsilon=epsilon)
+                solver._iterate()
+
+                bound = solver._error_bound()
+
+                for user, user_data in exact.users.items():
+                    error = abs(
+                        solver.users[user].next_strength -
+                        user_data.next_strength)
+
+                    self.assertTrue(error <= bound + 1e-12)
+
+                    checked += error > 0
+
+        # approximations did change something
+        self.assertTrue(checked)
+
+        solver = Solver(p, max_iterations=10, max_depth=1)
+        solver.solve()
+
+        self.assertEqual(solver.report.error_bound, solver._error_bound())
+
+        exact = Solver(p, max_iterations=10)
+        exact.solve()
+
+        self.assertIsNone(exact.report.error_bound)
+
+    def test_no_users_strength(self):
+        """
+        t1 -x- t2, both voted by the only user
+        """
+
+        u1 = User('u1')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', True)
+
+        c12 = Relation(Relation.CONTRADICTION, t1, t2)
+
+        p = Problem('p')
+
+        p.add_thesis(t1)
+        p.add_thesis(t2)
+        p.add_relation(c12)
+
+        for voted in [t1, t2, c12]:
+            voted.upvote(u1)
+
+        solver = Solver(p)
+
+        self.assertEqual(solver.solve(), t1)
+        self.assertEqual(solver.report.iterations, 2)
+        self.assertFalse(solver.report.converged)
+        self.assertEqual(solver.users[u1].strength, 0)
@@ -0,0 +1,100 @@
+import os
+import random
+import tempfile
+from unittest import TestCase, skipUnless
+
+from dr.model import User, Problem
+from dr import simple_solver
+
+try:
+    import numpy
+
+    from dr import numpy_solver
+    from dr import snapshot
+except ImportError:  # numpy is an optional extra
+    numpy_solver = None
+
+from .fixtures import random_problem
+
+
+@skipUnless(numpy_solver, 'numpy is not installed')
+class TestSnapshot (TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.snapshot')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_round_trip(self):
+        p = random_problem(
+            random.Random(2), support_rate=2 / 3, downvote_rate=.2)
+
+        snapshot.write(self.path, p)
+
+        with snapshot.Snapshot(self.path) as s:
+            self.assertFalse(s.has_strengths)
+            self.assertEqual(s.question, 'p')
+            self.assertEqual(len(s.arrays['thesis_solution']), 8)
+            self.assertEqual(len(s.arrays['relation_type']), len(p.relations))
+            self.assertFalse(s.arrays['vote_sign'].flags.writeable)
+
+            decoded, theses = s.problem()
+
+            self.assertEqual(s.thesis_contents(), [t.content for t in theses])
+
+            del theses
+
+        self.assertEqual(decoded.theses, p.theses)
+        self.assertEqual(decoded.relations, p.relations)
+
+        for voted in decoded.theses | decoded.relations:
+            other = next(v for v in p.theses | p.relations if v == voted)
+
+            self.assertEqual(voted.votes, other.votes)
+
+    def test_empty(self):
+        snapshot.write(self.path, Problem('p'))
+
+        with snapshot.Snapshot(self.path) as s:
+            decoded, theses = s.problem()
+
+        self.assertEqual(decoded.theses, set())
+
+    def test_warm_start(self):
+        rnd = random.Random(4)
+
+        for module in [simple_solver, numpy_solver]:
+            p = random_problem(rnd, support_rate=2 / 3, downvote_rate=.2)
+
+            solver = module.Solver(p, max_iterations=100)
+            solution = solver.solve()
+
+            if not solver.report.converged:
+                continue
+
+            snapshot.write(self.path, p, solver)
+
+            s = snapshot.Snapshot(self.path)
+
+            self.assertTrue(s.has_strengths)
+
+            decoded, theses = s.problem()
+
+            warm = module.Solver(decoded)
+            s.warm_start(warm)
+
+            self.assertEqual(warm.solve(), solution)
+            self.assertEqual(warm.report.iterations, 1)
+
+            numpy.testing.assert_allclose(
+                s.arrays['thesis_strength'],
+                [solver.theses_data[t].strength for t in theses])
+
+            # the warm solve starts where the first one stopped
+            for user, user_data in solver.users.items():
+                self.assertAlmostEqual(
+                    warm.users[User(user.name)].strength,
+                    user_data.next_strength)
+
+            s.close()
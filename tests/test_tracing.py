@@ -0,0 +1,57 @@
+from unittest import TestCase, skipUnless
+
+from dr.model import User
+from dr.tracing import Tracer
+from dr import simple_solver
+
+try:
+    from dr import numpy_solver
+except ImportError:  # numpy is an optional extra
+    numpy_solver = None
+
+from .fixtures import debate, thesis
+
+
+class TestTracing (TestCase):
+    def test_ring_buffer(self):
+        self.check_ring_buffer(simple_solver)
+
+    @skipUnless(numpy_solver, 'numpy is not installed')
+    def test_ring_buffer_numpy(self):
+        histories = [self.check_ring_buffer(simple_solver),
+                     self.check_ring_buffer(numpy_solver)]
+
+        for (i1, s1), (i2, s2) in zip(*histories):
+            self.assertEqual(i1, i2)
+            self.assertAlmostEqual(s1, s2)
+
+    def check_ring_buffer(self, module):
+        p = debate()
+
+        u1 = User('u1')
+        t1 = thesis(p, 't1')
+
+        tracer = Tracer(capacity=2)
+
+        # a negative threshold is never reached
+        solver = module.Solver(
+            p, error_threshold=-1, max_iterations=5, tracer=tracer)
+        solver.solve()
+
+        self.assertEqual(
+            tracer.residuals(),
+            [(4, solver.report.residuals[3]),
+             (5, solver.report.residuals[4])])
+
+        last = tracer.snapshots[-1]
+
+        self.assertEqual(set(last.users), set(p.voters))
+        self.assertEqual(set(last.theses), p.theses)
+        self.assertEqual(set(last.relations), p.relations)
+        self.assertAlmostEqual(
+            last.users[u1], solver.users[u1].next_strength)
+
+        self.assertEqual(len(tracer.history(u1)), 2)
+        self.assertEqual(len(tracer.history(t1)), 2)
+
+        return tracer.history(u1)
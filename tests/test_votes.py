@@ -0,0 +1,80 @@
+from unittest import TestCase, skipUnless
+
+from dr.model import Thesis, Relation, User, Problem
+from dr import simple_solver
+
+try:
+    from dr.votes import VoteStore
+    from dr import numpy_solver
+except ImportError:  # numpy is an optional extra
+    numpy_solver = None
+
+
+@skipUnless(numpy_solver, 'numpy is not installed')
+class TestVoteStore (TestCase):
+    def test_store(self):
+        u1 = User('u1')
+        u2 = User('u2')
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', True)
+
+        store = VoteStore()
+
+        store.append(u1, t1, +1)
+        store.extend([(u2, t1, -1), (u1, t2, +1), (u1, t1, -1)])
+
+        self.assertEqual(len(store), 4)
+
+        users, objects, signs = store.columns()
+
+        # last vote wins
+        self.assertEqual(users.tolist(), [0, 1, 0])
+        self.assertEqual(objects.tolist(), [0, 0, 1])
+        self.assertEqual(signs.tolist(), [-1, -1, 1])
+
+        users, signs = store.object_votes(t1)
+
+        self.assertEqual(users.tolist(), [0, 1])
+        self.assertEqual(signs.tolist(), [-1, -1])
+
+        objects, signs = store.user_votes(u1)
+
+        self.assertEqual(objects.tolist(), [0, 1])
+        self.assertEqual(signs.tolist(), [-1, 1])
+
+        self.assertEqual(store.user_votes(User('u3'))[0].tolist(), [])
+
+        store.extend_ids([1], [1], [+1])
+
+        self.assertEqual(store.user_votes(u2)[0].tolist(), [0, 1])
+
+    def test_problem_store(self):
+        u1 = User('u1')
+        u2 = User('u2')
+
+        t1 = Thesis('t1', True)
+        t2 = Thesis('t2', True)
+
+        r = Relation(Relation.CONTRADICTION, t1, t2)
+
+        p = Problem('p')
+
+        p.add_thesis(t1)
+        p.add_thesis(t2)
+        p.add_relation(r)
+
+        t1.upvote(u1)
+
+        store = p.enable_vote_store()
+
+        self.assertEqual(len(store), 1)
+
+        t1.upvote(u2)
+        t2.upvote(u2)
+        r.downvote(u1)
+
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.object_votes(r)[1].tolist(), [-1])
+
+        self.assertEqual(
+            numpy_solver.Solver(p).solve(), simple_solver.Solver(p).solve())